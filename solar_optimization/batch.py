@@ -0,0 +1,227 @@
+# batch.py
+"""
+Headless batch planner: many roofs in, one JSON result line per roof out.
+Run:  python batch.py roofs.jsonl -o results.jsonl --workers 8 --method grid
+      python batch.py roofs.jsonl --export layouts.npz   (every layout, see export.py)
+
+Nothing here imports matplotlib; the plotting entry points stay GUI-only.
+
+JSONL input, one roof plane per line (fields as in config.RoofCfg / PanelCfg /
+ObstacleCfg; "panel", "obstacles", "method" and "side" are optional):
+    {"id": "r1", "roof": {"width": 5500, "length": 20000, "border": 300},
+     "panel": {"width": 1000, "height": 1700, "gap_x": 100, "gap_y": 100},
+     "obstacles": [{"x": 5000, "y": 2870, "w": 780, "h": 1180, "clearance": 100}],
+     "method": "grid"}
+
+CSV input, rows grouped by roof_id; a "kind" column says what each row is:
+    roof_id,kind,width,length,border,panel_width,panel_height,gap_x,gap_y,method,x,y,w,h,clearance,type
+    r1,roof,5500,20000,300,1000,1700,100,100,grid,,,,,,
+    r1,obstacle,,,,,,,,,5000,2870,780,1180,100,window
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+from config import RoofCfg, PanelCfg, ObstacleCfg
+from roof import Roof
+from panel import Panel
+from project_utils import Obstacle, assert_layout_valid
+from export import LayoutWriter
+from visualization import calculate_best_layout
+from visualization_ea import _run_ga_for_side
+from visualization_exact import _solve_exact_for_side
+
+METHODS = ("grid", "ea", "exact")
+
+# CSV columns that feed each config dataclass
+_CSV_ROOF = {"width": "width", "length": "length", "border": "border"}
+_CSV_PANEL = {"panel_width": "width", "panel_height": "height",
+              "gap_x": "gap_x", "gap_y": "gap_y", "clamp": "clamp"}
+_CSV_OBSTACLE = ("x", "y", "w", "h", "clearance", "elev", "type",
+                 "frame_t", "grid_cols", "grid_rows", "cap_over")
+
+
+# ---------- INPUT ----------
+
+def _num(v: str):
+    """CSV cell -> int/float (strings such as obstacle type pass through)."""
+    try:
+        f = float(v)
+    except ValueError:
+        return v
+    return int(f) if f.is_integer() else f
+
+
+def _read_jsonl(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                rec = json.loads(line)
+                rec.setdefault("id", str(line_no))
+                yield rec
+
+
+def _read_csv(path: str) -> Iterator[dict]:
+    """Group roof/obstacle rows by roof_id into JSONL-shaped records (input order kept)."""
+    records = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {k: v for k, v in row.items() if v not in (None, "")}
+            rid = row["roof_id"]
+            rec = records.setdefault(rid, {"id": rid, "roof": {}, "panel": {}, "obstacles": []})
+            if row.get("kind", "roof") == "obstacle":
+                rec["obstacles"].append({k: _num(row[k]) for k in _CSV_OBSTACLE if k in row})
+            else:
+                rec["roof"].update({dst: _num(row[src]) for src, dst in _CSV_ROOF.items() if src in row})
+                rec["panel"].update({dst: _num(row[src]) for src, dst in _CSV_PANEL.items() if src in row})
+                for key in ("method", "side"):
+                    if key in row:
+                        rec[key] = row[key]
+    return iter(records.values())
+
+
+def read_roofs(path: str) -> Iterator[dict]:
+    """Yield roof records from a .jsonl or .csv file."""
+    if path.lower().endswith(".csv"):
+        return _read_csv(path)
+    return _read_jsonl(path)
+
+
+# ---------- PLANNING ----------
+
+def _plan(method: str, roof: Roof, panel: Panel, border: int, obstacles: List[Obstacle],
+          side: str, options: dict) -> dict:
+    if method == "grid":
+        layouts = [calculate_best_layout(roof, panel, border, obstacles, o)
+                   for o in ("portrait", "landscape")]
+        return max(layouts, key=lambda d: d["total_panels"])   # ties -> portrait, as in visualization.py
+    if method == "ea":
+        return _run_ga_for_side(side, roof, panel, border, obstacles, **{"verbose": False, **options})
+    if method == "exact":
+        return _solve_exact_for_side(side, roof, panel, border, obstacles, **{"verbose": False, **options})
+    raise ValueError(f"method must be one of {'|'.join(METHODS)}, got {method!r}")
+
+
+def plan_roof(record: dict, method: str = "grid", options: Optional[dict] = None,
+              with_rects: bool = False, keep_layout: bool = False) -> dict:
+    """
+    Plan one roof record and return a JSON-ready result.
+    options: {method: solver keyword arguments}, e.g. {"ea": {"seed": 1}}.
+    Failures are reported in the result ("error") instead of raised,
+    so one bad roof does not stop a batch.
+    keep_layout adds "_layout": (side, data, panel) for export.LayoutWriter;
+    it is not JSON and is popped by the caller.
+    """
+    t0 = time.perf_counter()
+    method = record.get("method", method)
+    out = {"id": record.get("id"), "method": method}
+    try:
+        side = record.get("side", "L")
+        roof_cfg = RoofCfg(**record.get("roof", {}))
+        panel_cfg = PanelCfg(**record.get("panel", {}))
+        obstacles = [Obstacle(**vars(ObstacleCfg(**{"side": side, **ob})))
+                     for ob in record.get("obstacles", [])]
+        roof = Roof(width=roof_cfg.width, length=roof_cfg.length)
+        panel = Panel(width=panel_cfg.width, height=panel_cfg.height,
+                      gap_x=panel_cfg.gap_x, gap_y=panel_cfg.gap_y,
+                      clamp_margin=panel_cfg.clamp)
+
+        data = _plan(method, roof, panel, roof_cfg.border, obstacles, side,
+                     (options or {}).get(method, {}))
+        assert_layout_valid(roof, roof_cfg.border, data, obstacles)
+
+        out["total_panels"] = data["total_panels"]
+        for key in ("orientation", "note", "optimal", "upper_bound", "gap", "stop_reason"):
+            if key in data:
+                out[key] = data[key]
+        if with_rects:
+            out["placed_rects"] = [list(r) for r in data["placed_rects"]]
+        if keep_layout:
+            keys = ("placed_rects", "start_x", "start_y", "panel_w", "panel_h")
+            out["_layout"] = (side, {k: data[k] for k in keys}, panel)
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    out["elapsed_s"] = round(time.perf_counter() - t0, 6)
+    return out
+
+
+def _plan_task(args) -> dict:
+    record, method, options, with_rects, keep_layout = args
+    return plan_roof(record, method, options, with_rects, keep_layout)
+
+
+def plan_batch(records: Iterable[dict], workers: int = 1, method: str = "grid",
+               options: Optional[dict] = None, with_rects: bool = False,
+               chunksize: int = 16, keep_layout: bool = False) -> Iterator[dict]:
+    """
+    Plan every record, yielding results in input order as they become ready.
+    workers > 1 spreads roofs over a process pool.
+    """
+    tasks = ((rec, method, options, with_rects, keep_layout) for rec in records)
+    if workers <= 1:
+        yield from map(_plan_task, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_plan_task, tasks, chunksize=chunksize)
+
+
+# ---------- CLI ----------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Headless batch roof planner (JSONL/CSV in, JSONL out).")
+    ap.add_argument("input", help="roof definitions (.jsonl or .csv)")
+    ap.add_argument("-o", "--output", help="result JSONL file (default: stdout)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--method", choices=METHODS, default="grid",
+                    help="default planner; a record's own \"method\" wins")
+    ap.add_argument("--rects", action="store_true", help="include placed_rects in every result")
+    ap.add_argument("--generations", type=int, default=10, help="GA generations (method=ea)")
+    ap.add_argument("--pop-size", type=int, default=30, help="GA population (method=ea)")
+    ap.add_argument("--seed", type=int, default=None, help="GA seed (method=ea)")
+    ap.add_argument("--time-limit", type=float, default=None,
+                    help="per-roof budget in seconds (ea: time_budget, exact: time_limit)")
+    ap.add_argument("--slot-step", type=float, default=None,
+                    help="ea/exact: every feasible slot on this step (mm) instead of the two lattices; "
+                         "slots grow with 1/step**2, so 200 or more on big roofs")
+    ap.add_argument("--export", help="also write every layout to this .csv/.jsonl/.npz file (see export.py)")
+    args = ap.parse_args(argv)
+
+    options = {
+        "ea": dict(n_generations=args.generations, pop_size=args.pop_size,
+                   seed=args.seed, time_budget=args.time_limit, slot_step=args.slot_step),
+        "exact": dict(time_limit=args.time_limit, slot_step=args.slot_step),
+    }
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    writer = LayoutWriter(args.export) if args.export else None
+    n = n_err = 0
+    t0 = time.perf_counter()
+    try:
+        for res in plan_batch(read_roofs(args.input), workers=args.workers, method=args.method,
+                              options=options, with_rects=args.rects, keep_layout=writer is not None):
+            layout = res.pop("_layout", None)
+            if layout is not None:
+                writer.write_layout(res["id"], *layout)
+            out.write(json.dumps(res) + "\n")
+            out.flush()
+            n += 1
+            n_err += "error" in res
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if writer is not None:
+            writer.close()
+    print(f"[BATCH] {n} roofs planned, {n_err} errors, {time.perf_counter() - t0:.2f} s",
+          file=sys.stderr)
+    return 1 if n_err else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# bench_import.py
+"""
+Import-time benchmark and regression guard for the headless layout engine.
+Run:  python bench_import.py [--budget-ms 400] [--repeat 5] [--json out.json]
+
+Each module is imported in a fresh interpreter (cold start), timed, and
+checked for GUI/plotting dependencies. Exit code 1 when any headless module
+pulls in matplotlib, PIL or tkinter, or its median import time exceeds the budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# modules that must import without any plotting/GUI stack
+HEADLESS_MODULES = [
+    "panel", "layout", "geometry", "occupancy", "export", "project_utils", "config", "roof",
+    "visualization", "visualization_ea", "visualization_exact", "batch", "main",
+]
+FORBIDDEN = ("matplotlib", "PIL", "tkinter")
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+bad = sorted({{m.split('.')[0] for m in sys.modules}} & set({forbidden!r}))
+print(json.dumps({{"seconds": dt, "forbidden": bad}}))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """Median cold import time of one module and the forbidden packages it loaded."""
+    times, forbidden = [], set()
+    code = _PROBE.format(module=module, forbidden=FORBIDDEN)
+    for _ in range(repeat):
+        res = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR,
+                             capture_output=True, text=True, check=True)
+        probe = json.loads(res.stdout.strip().splitlines()[-1])
+        times.append(probe["seconds"])
+        forbidden.update(probe["forbidden"])
+    return {"module": module, "median_ms": 1000 * statistics.median(times),
+            "min_ms": 1000 * min(times), "forbidden": sorted(forbidden)}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Cold import-time benchmark for headless modules.")
+    ap.add_argument("--budget-ms", type=float, default=400.0,
+                    help="max median import time per module")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("modules", nargs="*", default=HEADLESS_MODULES)
+    args = ap.parse_args(argv)
+
+    results, failed = [], False
+    for module in args.modules:
+        r = measure(module, args.repeat)
+        r["ok"] = not r["forbidden"] and r["median_ms"] <= args.budget_ms
+        failed |= not r["ok"]
+        results.append(r)
+        extra = f"  loads {', '.join(r['forbidden'])}" if r["forbidden"] else ""
+        print(f"{'OK ' if r['ok'] else 'BAD'} {module:<22} median={r['median_ms']:7.1f} ms "
+              f"min={r['min_ms']:7.1f} ms{extra}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "budget_ms": args.budget_ms,
+                       "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
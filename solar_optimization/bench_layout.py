@@ -0,0 +1,216 @@
+# bench_layout.py
+"""
+Benchmark suite for the layout pipeline and the GA.
+Run:  python bench_layout.py [--quick] [--json results.json] [--compare baseline.json]
+      python bench_layout.py --dense
+
+Synthetic roofs vary roof size, panel size and obstacle count (the GA slot
+count follows from these). For every case each stage is timed (best of
+--repeat runs), its peak traced memory measured in a separate run, and the
+number of placed panels recorded. Results are saved as JSON; --compare
+flags stages that got slower than the baseline by more than --tolerance.
+--dense instead reports slots, conflict-graph cost and GA result per slot_step.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from roof import Roof
+from panel import (
+    Panel, fill_roof_with_panels, fill_with_obstacles,
+    augment_with_gap_portraits, augment_with_shifted_portrait, clear_lattice_cache,
+)
+from project_utils import Obstacle
+from visualization_ea import _generate_slots_for_side, _run_ga_for_side, _slots_and_conflicts
+
+BORDER = 300
+
+# (length, width) in mm
+ROOF_SIZES = [(20000, 5500), (40000, 8000), (80000, 12000)]
+PANEL_SIZES = [(1000, 1700), (1134, 1722)]
+OBSTACLE_COUNTS = [0, 5, 25]
+
+QUICK_ROOF_SIZES = [(20000, 5500), (40000, 8000)]
+QUICK_OBSTACLE_COUNTS = [0, 5]
+
+DENSE_STEPS = [None, 400.0, 200.0, 100.0, 50.0]   # None = the two lattices
+
+
+# ---------- SYNTHETIC ROOFS ----------
+
+def synthetic_roof(length: int, width: int, n_obstacles: int, seed: int = 0
+                   ) -> Tuple[Roof, List[Obstacle]]:
+    """Roof plus n_obstacles random skylights/vents/chimneys inside its border."""
+    rng = random.Random(seed)
+    obstacles = []
+    for _ in range(n_obstacles):
+        w, h = rng.uniform(300, 1500), rng.uniform(300, 1500)
+        x = rng.uniform(BORDER, max(BORDER, length - BORDER - w))
+        y = rng.uniform(BORDER, max(BORDER, width - BORDER - h))
+        typ = rng.choice(["window", "chimney", "generic"])
+        obstacles.append(Obstacle("L", x, y, w, h, clearance=rng.choice([100.0, 200.0]), type=typ))
+    return Roof(width=width, length=length), obstacles
+
+
+# ---------- MEASUREMENT ----------
+
+def _timed(fn: Callable, repeat: int):
+    """
+    Best wall time over repeat calls and the last result.
+    The lattice/slot memo caches are cleared before every call, so each
+    repetition pays the full layout cost instead of timing cache hits.
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        clear_lattice_cache()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def _peak_bytes(fn: Callable) -> int:
+    clear_lattice_cache()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_case(length: int, width: int, panel_wh: Tuple[int, int], n_obstacles: int,
+               repeat: int = 3, ga_generations: int = 10, ga_pop: int = 30) -> List[dict]:
+    """Run every stage on one synthetic roof; returns one record per stage."""
+    roof, obstacles = synthetic_roof(length, width, n_obstacles, seed=n_obstacles)
+    panel = Panel(panel_wh[0], panel_wh[1], gap_x=100, gap_y=100)
+
+    base = fill_roof_with_panels(roof, panel, BORDER, BORDER, orientation="auto")
+    masked = fill_with_obstacles(roof, panel, base, obstacles)
+    n_slots = len(_generate_slots_for_side("L", roof, panel, BORDER, obstacles))
+
+    def ga():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return _run_ga_for_side("L", roof, panel, BORDER, obstacles,
+                                    n_generations=ga_generations, pop_size=ga_pop,
+                                    seed=0, stop_at_bound=False)
+
+    stages = [
+        ("fill_roof_with_panels", lambda: fill_roof_with_panels(roof, panel, BORDER, BORDER, orientation="auto")),
+        ("fill_with_obstacles", lambda: fill_with_obstacles(roof, panel, base, obstacles)),
+        ("augment_with_gap_portraits", lambda: augment_with_gap_portraits(roof, panel, masked, obstacles)),
+        ("augment_with_shifted_portrait", lambda: augment_with_shifted_portrait(roof, panel, masked, obstacles)),
+        ("run_ga_for_side", ga),
+    ]
+    case = {"roof_length": length, "roof_width": width, "panel_w": panel_wh[0],
+            "panel_h": panel_wh[1], "obstacles": n_obstacles, "slots": n_slots}
+    records = []
+    for name, fn in stages:
+        seconds, out = _timed(fn, 1 if name == "run_ga_for_side" else repeat)
+        records.append({**case, "stage": name, "seconds": seconds,
+                        "peak_bytes": _peak_bytes(fn), "panels": out["total_panels"]})
+    return records
+
+
+def bench_dense(steps=DENSE_STEPS, length: int = 20000, width: int = 5500, n_obstacles: int = 5,
+                ga_generations: int = 10, ga_pop: int = 30) -> List[dict]:
+    """
+    Cost of dense slots per slot_step on one roof: slot count, conflict
+    graph build time and bitset size, and what a short GA makes of them.
+    """
+    roof, obstacles = synthetic_roof(length, width, n_obstacles, seed=n_obstacles)
+    panel = Panel(1000, 1700, gap_x=100, gap_y=100)
+    records = []
+    for step in steps:
+        clear_lattice_cache()
+        t0 = time.perf_counter()
+        slots, conflicts = _slots_and_conflicts("L", roof, panel, BORDER, obstacles, step)
+        graph_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        data = _run_ga_for_side("L", roof, panel, BORDER, obstacles, n_generations=ga_generations,
+                                pop_size=ga_pop, seed=0, stop_at_bound=False, slot_step=step,
+                                verbose=False)
+        records.append({"slot_step": step, "slots": len(slots), "graph_seconds": graph_s,
+                        "graph_bytes": sum(sys.getsizeof(c) for c in conflicts),
+                        "ga_seconds": time.perf_counter() - t0, "panels": data["total_panels"]})
+    return records
+
+
+def _key(r: dict) -> tuple:
+    return (r["stage"], r["roof_length"], r["roof_width"], r["panel_w"], r["panel_h"], r["obstacles"])
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Stages slower than baseline * (1 + tolerance), or placing different panel counts."""
+    base = {_key(r): r for r in baseline}
+    problems = []
+    for r in results:
+        b = base.get(_key(r))
+        if b is None:
+            continue
+        if r["seconds"] > b["seconds"] * (1 + tolerance):
+            problems.append(f"{_key(r)}: {b['seconds']*1e3:.2f} ms -> {r['seconds']*1e3:.2f} ms")
+        if r["panels"] != b["panels"]:
+            problems.append(f"{_key(r)}: panels {b['panels']} -> {r['panels']}")
+    return problems
+
+
+# ---------- CLI ----------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Layout pipeline / GA benchmark suite.")
+    ap.add_argument("--quick", action="store_true", help="smaller case grid")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--compare", help="baseline JSON from a previous --json run")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="allowed relative slowdown vs baseline")
+    ap.add_argument("--dense", action="store_true",
+                    help="only measure dense-slot cost per slot_step (see bench_dense)")
+    args = ap.parse_args(argv)
+
+    if args.dense:
+        print(f"{'slot_step':>9} {'slots':>7} {'graph ms':>9} {'graph MiB':>10} {'GA ms':>9} {'panels':>7}")
+        for r in bench_dense():
+            print(f"{str(r['slot_step']):>9} {r['slots']:>7} {r['graph_seconds']*1e3:>9.1f} "
+                  f"{r['graph_bytes']/2**20:>10.1f} {r['ga_seconds']*1e3:>9.1f} {r['panels']:>7}")
+        return 0
+
+    roof_sizes = QUICK_ROOF_SIZES if args.quick else ROOF_SIZES
+    obstacle_counts = QUICK_OBSTACLE_COUNTS if args.quick else OBSTACLE_COUNTS
+
+    results = []
+    print(f"{'stage':<30} {'roof':>12} {'panel':>10} {'obs':>4} {'slots':>6} "
+          f"{'ms':>9} {'peak KiB':>9} {'panels':>7}")
+    for (length, width), panel_wh, n_obs in itertools.product(roof_sizes, PANEL_SIZES, obstacle_counts):
+        for r in bench_case(length, width, panel_wh, n_obs, repeat=args.repeat):
+            results.append(r)
+            print(f"{r['stage']:<30} {f'{length}x{width}':>12} {f'{panel_wh[0]}x{panel_wh[1]}':>10} "
+                  f"{n_obs:>4} {r['slots']:>6} {r['seconds']*1e3:>9.2f} "
+                  f"{r['peak_bytes']/1024:>9.1f} {r['panels']:>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "machine": platform.machine(),
+                       "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            problems = compare(results, json.load(f)["results"], args.tolerance)
+        for p in problems:
+            print("REGRESSION", p)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
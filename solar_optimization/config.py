@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional, Tuple
 
 @dataclass
 class RoofCfg:
@@ -26,6 +26,8 @@ class ObstacleCfg:
     grid_cols: int = 2
     grid_rows: int = 3
     cap_over: float = 80.0    # chimney cap overhang
+    shape: str = "rect"       # "rect" | "circle" | "polygon" (see occupancy.py)
+    points: Optional[List[Tuple[float, float]]] = None  # polygon vertices (mm); x/y/w/h = bounding box
 
 @dataclass
 class Config:
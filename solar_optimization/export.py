@@ -0,0 +1,219 @@
+# export.py
+"""
+Bulk layout export from Layout columns.
+
+Layouts are appended to column buffers (array copies, no per-panel Python
+work) and converted in chunks: row/col rounding and number formatting run
+once over many roofs, and each chunk is written in a single call, instead
+of one csv.writerow per panel. LayoutWriter streams many roofs into one file:
+    .csv    roof_id,side,x_mm,y_mm,w_mm,h_mm,row,col,orient (one line per panel)
+    .jsonl  one object per roof with its columns; the file is opened for
+            appending, so a stream can be continued by later runs
+    .npz    one array per column for all roofs, plus roof_id/side per roof and
+            offsets (panels of roof k are offsets[k]:offsets[k+1]); needs NumPy
+
+row/col are the base-grid cell where the layout knows it (Layout.row/col)
+and otherwise the nominal cell from rounding, as export_csv always did.
+orient is "P" (portrait) or "L" (landscape).
+"""
+
+import json
+import os
+from array import array
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: only the .npz format needs it
+    np = None
+
+from layout import Layout, LANDSCAPE
+
+FORMATS = ("csv", "jsonl", "npz")
+CSV_HEADER = ("roof_id", "side", "x_mm", "y_mm", "w_mm", "h_mm", "row", "col", "orient")
+CHUNK_PANELS = 1 << 16   # panels buffered before a csv/jsonl chunk is written
+
+
+# ---------- COLUMNS ----------
+
+class _ColumnBuffer:
+    """
+    Raw panel columns of many layouts plus, per panel, the grid origin and
+    pitch needed for the nominal row/col; converted in one pass by columns().
+    """
+    _RAW = (("x", "d"), ("y", "d"), ("w", "d"), ("h", "d"), ("orient", "b"), ("row", "i"), ("col", "i"),
+            ("sx", "d"), ("sy", "d"), ("px", "d"), ("py", "d"))
+
+    def __init__(self):
+        for name, code in self._RAW:
+            setattr(self, name, array(code))
+        self.roofs = []   # (roof_id, side, n)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def add(self, roof_id, side: str, data: dict, panel) -> int:
+        lay = Layout.of(data.get("placed_rects", []))
+        n = len(lay)
+        for name in ("x", "y", "w", "h", "orient", "row", "col"):
+            getattr(self, name).extend(getattr(lay, name))
+        for name, v in (("sx", data["start_x"]), ("sy", data["start_y"]),
+                        ("px", data["panel_w"] + panel.gap_x), ("py", data["panel_h"] + panel.gap_y)):
+            getattr(self, name).extend(array("d", [v]) * n)
+        self.roofs.append((roof_id, side, n))
+        return n
+
+    def columns(self) -> dict:
+        """{"x", "y", "w", "h", "row", "col", "orient" (0/1)} as NumPy arrays, or lists without NumPy."""
+        if np is not None:
+            a = {name: np.frombuffer(getattr(self, name), dtype=np.dtype(code)) if len(self) else
+                 np.zeros(0, dtype=np.dtype(code)) for name, code in self._RAW}
+            out = {k: a[k] for k in ("x", "y", "w", "h", "orient")}
+            for k, v, s, p in (("row", "y", "sy", "py"), ("col", "x", "sx", "px")):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    nominal = np.where(a[p] > 0, np.rint((a[v] - a[s])/a[p]), 0.0).astype(np.int64)
+                out[k] = np.where(a[k] >= 0, a[k], nominal)
+            return out
+        out = {k: list(getattr(self, k)) for k in ("x", "y", "w", "h", "orient")}
+        for k, v, s, p in (("row", "y", "sy", "py"), ("col", "x", "sx", "px")):
+            out[k] = [c if c >= 0 else (round((val - st)/pi) if pi > 0 else 0)
+                      for c, val, st, pi in zip(getattr(self, k), getattr(self, v),
+                                                getattr(self, s), getattr(self, p))]
+        return out
+
+
+def _tolist(v):
+    return v.tolist() if hasattr(v, "tolist") else list(v)
+
+def _mm_strings(values):
+    """Values rounded to whole mm as strings (round-half-even, as round() does)."""
+    if np is not None:
+        return map(str, np.rint(np.asarray(values, dtype=float)).astype(np.int64).tolist())
+    return (str(int(round(v))) for v in values)
+
+def _csv_text(cols: dict, prefix=(), orient: bool = True, eol: str = "\n") -> str:
+    """CSV lines of the columns (mm rounded to int), prefix: leading per-panel columns."""
+    if not len(cols["x"]):
+        return ""
+    fields = [*prefix, *(_mm_strings(cols[k]) for k in ("x", "y", "w", "h")),
+              map(str, _tolist(cols["row"])), map(str, _tolist(cols["col"]))]
+    if orient:
+        fields.append(["L" if o == LANDSCAPE else "P" for o in _tolist(cols["orient"])])
+    return eol.join(map(",".join, zip(*fields))) + eol
+
+def layout_columns(data: dict, panel) -> dict:
+    """
+    {"x", "y", "w", "h": floats, "row", "col": ints, "orient": "P"/"L"} lists
+    of one layout dict (placed_rects plus start_x/start_y/panel_w/panel_h).
+    """
+    buf = _ColumnBuffer()
+    buf.add(None, "", data, panel)
+    cols = {k: _tolist(v) for k, v in buf.columns().items()}
+    cols["orient"] = ["L" if o == LANDSCAPE else "P" for o in cols["orient"]]
+    return cols
+
+
+# ---------- WRITER ----------
+
+def write_csv(path: str, side: str, data: dict, panel) -> int:
+    """
+    Write one layout as side,x_mm,y_mm,w_mm,h_mm,row,col (the per-side CSV of
+    the plotting scripts) in a single buffered pass; returns the panel count.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    buf = _ColumnBuffer()
+    n = buf.add(None, side, data, panel)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("side,x_mm,y_mm,w_mm,h_mm,row,col\r\n")   # csv.writer line endings, as before
+        f.write(_csv_text(buf.columns(), ([side] * n,), orient=False, eol="\r\n"))
+    return n
+
+
+class LayoutWriter:
+    """
+    Stream layouts of many roofs into one file (format from fmt or the extension).
+    Use as a context manager, or call close(); .npz is written on close.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None, chunk_panels: int = CHUNK_PANELS):
+        fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {'|'.join(FORMATS)}, got {fmt!r}")
+        if fmt == "npz" and np is None:
+            raise ImportError("the .npz export requires NumPy")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path, self.fmt, self.chunk_panels = path, fmt, chunk_panels
+        self.roofs = self.panels = 0
+        self._buf = _ColumnBuffer()
+        self._f = None
+        if fmt == "csv":
+            self._f = open(path, "w", newline="", encoding="utf-8")
+            self._f.write(",".join(CSV_HEADER) + "\n")
+        elif fmt == "jsonl":
+            self._f = open(path, "a", encoding="utf-8")
+
+    def write_layout(self, roof_id, side: str, data: dict, panel) -> None:
+        """Append one roof's layout dict."""
+        self.panels += self._buf.add(roof_id, side, data, panel)
+        self.roofs += 1
+        if self._f is not None and len(self._buf) >= self.chunk_panels:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered csv/jsonl roofs (npz keeps everything until close)."""
+        buf = self._buf
+        if self._f is None or not buf.roofs:
+            return
+        cols = buf.columns()
+        if self.fmt == "csv":
+            ids, sides = [], []
+            for roof_id, side, n in buf.roofs:
+                ids += [str(roof_id)] * n
+                sides += [side] * n
+            self._f.write(_csv_text(cols, (ids, sides)))
+        else:
+            lists = {k: _tolist(v) for k, v in cols.items()}
+            lists["orient"] = ["L" if o == LANDSCAPE else "P" for o in lists["orient"]]
+            lines, k0 = [], 0
+            for roof_id, side, n in buf.roofs:
+                rec = {"roof_id": roof_id, "side": side, "panels": n}
+                rec.update((k, v[k0:k0 + n]) for k, v in lists.items())
+                lines.append(json.dumps(rec))
+                k0 += n
+            self._f.write("\n".join(lines) + "\n")
+        self._buf = _ColumnBuffer()
+
+    def close(self) -> None:
+        if self.fmt == "npz":
+            if self._buf is not None:
+                buf = self._buf
+                offsets = np.zeros(len(buf.roofs) + 1, dtype=np.int64)
+                np.cumsum([n for _, _, n in buf.roofs], out=offsets[1:])
+                cols = buf.columns()
+                cols["row"], cols["col"] = cols["row"].astype(np.int32), cols["col"].astype(np.int32)
+                np.savez(self.path, roof_id=np.array([str(r) for r, _, _ in buf.roofs], dtype=str),
+                         side=np.array([s for _, s, _ in buf.roofs], dtype=str), offsets=offsets, **cols)
+                self._buf = None
+        elif self._f is not None:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self) -> "LayoutWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def export_layouts(path: str, layouts: Iterable[tuple], fmt: Optional[str] = None) -> dict:
+    """
+    Write (roof_id, side, data, panel) layouts to one file.
+    Returns {"path", "format", "roofs", "panels"}.
+    """
+    with LayoutWriter(path, fmt) as wr:
+        for roof_id, side, data, panel in layouts:
+            wr.write_layout(roof_id, side, data, panel)
+    return {"path": path, "format": wr.fmt, "roofs": wr.roofs, "panels": wr.panels}
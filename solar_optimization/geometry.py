@@ -0,0 +1,99 @@
+# geometry.py
+"""
+Shared rectangle kernel. A rectangle is (x, y, w, h) in mm with (x, y) its
+lower-left corner; touching edges do not count as overlap.
+
+Scalar helpers are for the placement loops; the batched ones take
+sequences of rectangles (lists of tuples, (N, 4) arrays or a Layout) and
+work on NumPy arrays when NumPy is available, returning plain lists otherwise.
+"""
+
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: batched ops fall back to list comprehensions
+    np = None
+
+Rect = Tuple[float, float, float, float]
+
+
+# ---------- SCALAR ----------
+
+def overlap(ax, ay, aw, ah, bx, by, bw, bh) -> bool:
+    """Return True if rect A overlaps rect B."""
+    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
+
+def inflate(rect: Rect, dx: float, dy: Optional[float] = None) -> Rect:
+    """Grow rect by dx on the left/right and dy (default dx) on the bottom/top."""
+    if dy is None:
+        dy = dx
+    x, y, w, h = rect
+    return (x - dx, y - dy, w + 2*dx, h + 2*dy)
+
+def obstacle_rect(ob) -> Rect:
+    """Footprint (x, y, w, h) of an obstacle object or dict."""
+    if isinstance(ob, dict):
+        return (ob["x"], ob["y"], ob["w"], ob["h"])
+    return (ob.x, ob.y, ob.w, ob.h)
+
+def inflate_obstacle(ob) -> Rect:
+    """Obstacle footprint grown by its clearance (object or dict, clearance defaults to 0)."""
+    c = ob.get("clearance", 0.0) if isinstance(ob, dict) else getattr(ob, "clearance", 0.0)
+    return inflate(obstacle_rect(ob), c)
+
+def contains(outer: Rect, rect: Rect) -> bool:
+    """Return True if rect lies inside outer (edges may touch)."""
+    ox, oy, ow, oh = outer
+    x, y, w, h = rect
+    return x >= ox and y >= oy and x + w <= ox + ow and y + h <= oy + oh
+
+def clip(rect: Rect, bounds: Rect) -> Optional[Rect]:
+    """Part of rect inside bounds, or None when they do not overlap."""
+    x, y, w, h = rect
+    bx, by, bw, bh = bounds
+    x0, y0 = max(x, bx), max(y, by)
+    x1, y1 = min(x + w, bx + bw), min(y + h, by + bh)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+# ---------- BATCHED ----------
+
+def as_array(rects):
+    """(N, 4) float64 array of rectangles (requires NumPy)."""
+    if isinstance(rects, np.ndarray):
+        return rects.astype(float, copy=False).reshape(-1, 4)
+    if hasattr(rects, "to_numpy"):   # Layout: bulk column copy
+        cols = rects.to_numpy()
+        return np.stack([cols["x"], cols["y"], cols["w"], cols["h"]], axis=1)
+    return np.asarray(list(rects), dtype=float).reshape(-1, 4)
+
+def overlap_matrix(a, b):
+    """(N, M) overlap flags of every rect in a against every rect in b."""
+    if np is None:
+        return [[overlap(*r, *m) for m in b] for r in a]
+    a, b = as_array(a), as_array(b)
+    return ~((a[:, None, 0] + a[:, None, 2] <= b[None, :, 0]) |
+             (b[None, :, 0] + b[None, :, 2] <= a[:, None, 0]) |
+             (a[:, None, 1] + a[:, None, 3] <= b[None, :, 1]) |
+             (b[None, :, 1] + b[None, :, 3] <= a[:, None, 1]))
+
+def overlaps_any(a, b):
+    """(N,) flags: does rect i of a overlap any rect of b."""
+    if np is None:
+        b = list(b)
+        return [any(overlap(*r, *m) for m in b) for r in a]
+    if len(b) == 0:
+        return np.zeros(len(a), dtype=bool)
+    return overlap_matrix(a, b).any(axis=1)
+
+def contains_many(outer: Rect, rects):
+    """(N,) flags: rect i lies inside outer."""
+    if np is None:
+        return [contains(outer, r) for r in rects]
+    r = as_array(rects)
+    ox, oy, ow, oh = outer
+    return ((r[:, 0] >= ox) & (r[:, 1] >= oy) &
+            (r[:, 0] + r[:, 2] <= ox + ow) & (r[:, 1] + r[:, 3] <= oy + oh))
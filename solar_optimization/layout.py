@@ -0,0 +1,216 @@
+# layout.py
+"""
+Columnar container for placed panels.
+
+A Layout stores panels as contiguous array columns instead of a list of
+(x, y, w, h) tuples:
+    x, y, w, h   float64 (mm)
+    orient       int8    (0 = portrait, 1 = landscape, i.e. w > h)
+    row, col     int32   (base-grid cell, -1 for panels placed off the grid)
+
+It still behaves like the old list of 4-tuples (len, iteration, indexing,
+"+"), so it is stored under data["placed_rects"] and existing callers keep
+working. Slices are zero-copy views on the same columns. Appending to a view
+that ends where its storage ends extends the storage in place, so each
+pipeline stage can add panels without copying the previous stage's ones
+(the previous view keeps its own length); any other view is copied first.
+"""
+
+from array import array
+from typing import Iterable, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: columns are plain array objects
+    np = None
+
+PORTRAIT, LANDSCAPE = 0, 1
+
+_COLUMNS = (("x", "d"), ("y", "d"), ("w", "d"), ("h", "d"),
+            ("orient", "b"), ("row", "i"), ("col", "i"))
+_NP_TYPES = {"d": "float64", "b": "int8", "i": "int32"}
+
+Rect = Tuple[float, float, float, float]
+
+
+def _to_array(typecode: str, values, n: int) -> array:
+    """Column from a scalar (broadcast), a NumPy array (bulk copy) or any sequence."""
+    if values is None:
+        values = -1
+    if isinstance(values, (int, float)):
+        return array(typecode, [values]) * n
+    if np is not None and isinstance(values, np.ndarray):
+        out = array(typecode)
+        out.frombytes(np.ascontiguousarray(values, dtype=_NP_TYPES[typecode]).tobytes())
+        return out
+    return array(typecode, values)
+
+
+class _Storage:
+    """Append-only column storage shared by one or more Layout views."""
+    __slots__ = tuple(name for name, _ in _COLUMNS)
+
+    def __init__(self):
+        for name, code in _COLUMNS:
+            setattr(self, name, array(code))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+class Layout:
+    """Sequence of placed panels (x, y, w, h) backed by array columns (see module doc)."""
+    __slots__ = ("_s", "_start", "_stop")
+
+    def __init__(self, rects: Iterable[Rect] = ()):
+        self._s = _Storage()
+        self._start = self._stop = 0
+        self.extend(rects)
+
+    # ----- construction -----
+    @classmethod
+    def _view(cls, storage: _Storage, start: int, stop: int) -> "Layout":
+        lay = cls.__new__(cls)
+        lay._s, lay._start, lay._stop = storage, start, stop
+        return lay
+
+    @classmethod
+    def of(cls, rects) -> "Layout":
+        """rects itself if it already is a Layout, otherwise a new Layout of it."""
+        return rects if isinstance(rects, Layout) else cls(rects or ())
+
+    @classmethod
+    def from_columns(cls, x, y, w, h, row=None, col=None) -> "Layout":
+        """
+        Build from whole columns (NumPy arrays, sequences or scalars for w/h/row/col),
+        copying them in bulk rather than one panel at a time.
+        """
+        n = len(x)
+        s = _Storage()
+        s.x, s.y = _to_array("d", x, n), _to_array("d", y, n)
+        s.w, s.h = _to_array("d", w, n), _to_array("d", h, n)
+        s.orient = array("b", [LANDSCAPE if ww > hh else PORTRAIT for ww, hh in zip(s.w, s.h)])
+        s.row, s.col = _to_array("i", row, n), _to_array("i", col, n)
+        return cls._view(s, 0, n)
+
+    # ----- appending -----
+    def _detach(self) -> None:
+        """Give this view its own storage holding a copy of its range."""
+        s = _Storage()
+        for name, _ in _COLUMNS:
+            setattr(s, name, getattr(self._s, name)[self._start:self._stop])
+        self._s, self._start, self._stop = s, 0, self._stop - self._start
+
+    def _push(self, columns: dict) -> None:
+        """Append whole column chunks at the end of this view's storage."""
+        if self._stop != len(self._s):
+            self._detach()
+        done = []
+        try:
+            for name, _ in _COLUMNS:
+                col = getattr(self._s, name)
+                col.extend(columns[name])
+                done.append(col)
+        except BufferError:
+            # a zero-copy column view (memoryview/NumPy) pins the storage:
+            # roll back, move to a private copy and retry
+            k = len(columns["x"])
+            for col in done:
+                del col[len(col) - k:]
+            self._detach()
+            for name, _ in _COLUMNS:
+                getattr(self._s, name).extend(columns[name])
+        self._stop += len(columns["x"])
+
+    def append(self, x: float, y: float, w: float, h: float, row: int = -1, col: int = -1) -> None:
+        self._push({"x": (x,), "y": (y,), "w": (w,), "h": (h,),
+                    "orient": (LANDSCAPE if w > h else PORTRAIT,), "row": (row,), "col": (col,)})
+
+    def extend(self, rects: Iterable[Rect]) -> None:
+        if isinstance(rects, Layout):
+            # column-wise bulk copy, keeps orient/row/col
+            self._push({name: rects._col(name) for name, _ in _COLUMNS})
+            return
+        rects = list(rects)
+        if not rects:
+            return
+        x, y, w, h = zip(*rects)
+        self._push({"x": x, "y": y, "w": w, "h": h,
+                    "orient": [LANDSCAPE if ww > hh else PORTRAIT for ww, hh in zip(w, h)],
+                    "row": [-1] * len(x), "col": [-1] * len(x)})
+
+    def take(self, indices: Iterable[int]) -> "Layout":
+        """New Layout with the panels at the given positions (all columns kept)."""
+        idx = [self._start + i for i in indices]
+        s = _Storage()
+        for name, code in _COLUMNS:
+            col = getattr(self._s, name)
+            setattr(s, name, array(code, [col[i] for i in idx]))
+        return Layout._view(s, 0, len(idx))
+
+    # ----- columns -----
+    def _col(self, name: str) -> array:
+        return getattr(self._s, name)[self._start:self._stop]
+
+    def column(self, name: str) -> memoryview:
+        """Read-only zero-copy view of one column (x, y, w, h, orient, row, col)."""
+        return memoryview(getattr(self._s, name)).toreadonly()[self._start:self._stop]
+
+    def to_numpy(self) -> dict:
+        """{column name: NumPy array copy} for vectorized consumers."""
+        if np is None:
+            raise ImportError("Layout.to_numpy requires NumPy")
+        return {name: np.array(self.column(name)) for name, _ in _COLUMNS}
+
+    x = property(lambda self: self._col("x"))
+    y = property(lambda self: self._col("y"))
+    w = property(lambda self: self._col("w"))
+    h = property(lambda self: self._col("h"))
+    orient = property(lambda self: self._col("orient"))
+    row = property(lambda self: self._col("row"))
+    col = property(lambda self: self._col("col"))
+
+    # ----- list-of-tuples compatibility -----
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self):
+        return zip(self._col("x"), self._col("y"), self._col("w"), self._col("h"))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return Layout._view(self._s, self._start + start, self._start + max(start, stop))
+            return self.take(range(start, stop, step))
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("Layout index out of range")
+        s, k = self._s, self._start + i
+        return (s.x[k], s.y[k], s.w[k], s.h[k])
+
+    def __add__(self, other) -> "Layout":
+        out = Layout._view(self._s, self._start, self._stop)
+        out.extend(other)
+        return out
+
+    def __radd__(self, other) -> "Layout":
+        return Layout(other) + self
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (Layout, Sequence)) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(tuple(a) == tuple(b) for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"Layout({len(self)} panels)"
+
+    def __reduce__(self):
+        return (Layout.from_columns, (self._col("x"), self._col("y"), self._col("w"), self._col("h"),
+                                      self._col("row"), self._col("col")))
+
+    def tolist(self):
+        """Plain list of (x, y, w, h) tuples."""
+        return list(self)
@@ -1,71 +1,147 @@
-import os, csv
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 from panel import (
     Panel, best_orientation, fill_roof_with_panels,
-    fill_with_obstacles, augment_with_gap_portraits
+    fill_with_obstacles, augment_with_gap_portraits, blocked_cells, best_grid_offset,
+    ALIGN_X, ALIGN_Y
 )
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from config import Config
 from roof import Roof
-# IMPORT UPDATED: now importing the grid comparison renderer
-from visualization import draw_comparison_grid 
-
-
-# Local Obstacle class for rendering + inflated() expansion
-@dataclass
-class Obstacle:
-    side: str
-    x: float; y: float; w: float; h: float
-    clearance: float = 0.0
-    elev: float = 0.0
-    type: str = "generic"
-    frame_t: float = 80.0
-    grid_cols: int = 2
-    grid_rows: int = 3
-    cap_over: float = 80.0
-    def inflated(self):
-        c = self.clearance
-        return (self.x - c, self.y - c, self.w + 2*c, self.h + 2*c)
-
-
-# ---------- layout validator ----------
-def _overlap(ax, ay, aw, ah, bx, by, bw, bh) -> bool:
-    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
-
-def assert_layout_valid(roof, border, data, obstacles: List[Obstacle]) -> None:
+from project_utils import Obstacle, assert_layout_valid, export_csv
+# The grid comparison renderer (matplotlib) is imported lazily right before
+# plotting, so importing this module stays headless.
+
+
+# ---------- ALIGNMENT VARIANT SEARCH ----------
+# A variant is (align_x, align_y, offset_x, offset_y) for fill_roof_with_panels.
+
+def alignment_variants(panel: Panel, orientation: str, steps: int = 8) -> List[tuple]:
+    """
+    The 9 named alignments plus a steps x steps sweep of sub-pitch offsets
+    (grid phase 0, 1/steps, ... of the pitch in x and y).
+    """
+    w, h = (panel.width, panel.height) if orientation == "portrait" else (panel.height, panel.width)
+    px, py = w + panel.gap_x, h + panel.gap_y
+    variants = [(ax, ay, 0.0, 0.0) for ax in ALIGN_X for ay in ALIGN_Y]
+    variants += [("left", "top", px*i/steps, py*j/steps)
+                 for i in range(steps) for j in range(steps) if i or j]
+    return variants
+
+def _variant_label(variant: tuple) -> str:
+    ax, ay, ox, oy = variant
+    return f"{ax}/{ay}" if not (ox or oy) else f"offset=({ox:.0f}, {oy:.0f})"
+
+def _capacity(a: float, b: float, panel: Panel) -> int:
+    """Max portraits, pairwise gap-separated, inside an a x b box (product of floors)."""
+    if a < panel.width or b < panel.height:
+        return 0
+    return (int((a + panel.gap_x) // (panel.width + panel.gap_x) + 1e-9) *
+            int((b + panel.gap_y) // (panel.height + panel.gap_y) + 1e-9))
+
+def _gap_fill_bound(roof, panel, border, base, removed) -> int:
+    """
+    Upper bound on what augment_with_gap_portraits can add to the base grid
+    once the removed (row, col) cells are dropped.
+    An added portrait either lies outside the grid block, i.e. inside one of
+    the four margin strips, or meets the block only inside one 4-connected
+    group of removed cells (kept cells plus their gap are blocked); a group
+    box is extended to the border on the block edges it touches. Each box
+    holds at most _capacity() portraits.
+    """
     L, W = roof.length, roof.width
-    bx, by = border, border
-    rects = data.get("placed_rects", [])
-    # border check
-    for (x, y, w, h) in rects:
-        if not (x >= bx and y >= by and x + w <= L - bx and y + h <= W - by):
-            raise AssertionError(f"Panel out of border: {(x,y,w,h)}")
-        if w <= 0 or h <= 0:
-            raise AssertionError(f"Degenerate panel: {(x,y,w,h)}")
-    # obstacle collisions
-    masks = [ob.inflated() for ob in obstacles]
-    for (x, y, w, h) in rects:
-        for (mx, my, mw, mh) in masks:
-            if _overlap(x, y, w, h, mx, my, mw, mh):
-                raise AssertionError(f"Collision with obstacle at {(mx,my,mw,mh)} by {(x,y,w,h)}")
-
-
-# ---------- CSV export ----------
-def export_csv(path: str, side: str, data, panel: Panel):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    rects = data.get("placed_rects", [])
-    sx, sy = data["start_x"], data["start_y"]
-    w, h = data["panel_w"], data["panel_h"]
-    gx, gy = panel.gap_x, panel.gap_y
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        wr = csv.writer(f)
-        wr.writerow(["side", "x_mm", "y_mm", "w_mm", "h_mm", "row", "col"])
-        for (x, y, pw, ph) in rects:
-            r = round((y - sy) / (h + gy)) if (h + gy) > 0 else 0
-            c = round((x - sx) / (w + gx)) if (w + gx) > 0 else 0
-            wr.writerow([side, int(round(x)), int(round(y)), int(round(pw)), int(round(ph)), r, c])
+    nx, ny = base["cols"], base["rows"]
+    if nx == 0 or ny == 0:
+        return _capacity(L - 2*border, W - 2*border, panel)
+    sx, sy = base["start_x"], base["start_y"]
+    w, h = base["panel_w"], base["panel_h"]
+    px, py = w + panel.gap_x, h + panel.gap_y
+    x1, y1 = sx + nx*px - panel.gap_x, sy + ny*py - panel.gap_y
+
+    bound = (_capacity(sx - border, W - 2*border, panel) + _capacity(L - border - x1, W - 2*border, panel) +
+             _capacity(L - 2*border, sy - border, panel) + _capacity(L - 2*border, W - border - y1, panel))
+
+    removed = set(removed)
+    while removed:
+        stack = [removed.pop()]
+        rows, cols = [], []
+        while stack:
+            r, c = stack.pop()
+            rows.append(r); cols.append(c)
+            for nb in ((r+1, c), (r-1, c), (r, c+1), (r, c-1)):
+                if nb in removed:
+                    removed.discard(nb)
+                    stack.append(nb)
+        r0, r1, c0, c1 = min(rows), max(rows), min(cols), max(cols)
+        gx0 = border if c0 == 0 else sx + c0*px
+        gx1 = L - border if c1 == nx - 1 else sx + c1*px + w
+        gy0 = border if r0 == 0 else sy + r0*py
+        gy1 = W - border if r1 == ny - 1 else sy + r1*py + h
+        bound += _capacity(gx1 - gx0, gy1 - gy0, panel)
+    return bound
+
+def _screen_variant(roof, panel, border, obstacles, orientation, variant):
+    """Cheap stage of one variant: base grid, its obstacle-blocked cells and the final-count bound."""
+    base = fill_roof_with_panels(roof, panel, border, border, orientation, *variant)
+    removed = blocked_cells(base, panel, obstacles)
+    bound = base["total_panels"] - len(removed) + _gap_fill_bound(roof, panel, border, base, removed)
+    return base, bound
+
+def _finish_variant(args):
+    roof, panel, obstacles, base = args
+    masked = fill_with_obstacles(roof, panel, base, obstacles)
+    return augment_with_gap_portraits(roof, panel, masked, obstacles)
+
+def search_alignments(roof, panel, border, obstacles, orientation, steps: int = 8,
+                      top_k: int = 3, pool: Optional[ProcessPoolExecutor] = None,
+                      workers: int = 1) -> dict:
+    """
+    Evaluate every alignment variant of one roof side, plus the exact best
+    grid offset (best_grid_offset), and keep the top_k.
+    1. all variants are screened (base grid, blocked cells, bound) and
+       duplicates (same start/cols/rows) dropped;
+    2. survivors are masked and gap-filled in order of decreasing bound,
+       `workers` at a time (through pool when given); once the next bound
+       cannot beat the k-th best count, the rest is pruned.
+    The counts found do not depend on workers; among variants tied with the
+    k-th best, which ones are kept can.
+    Returns {"top": [(N, label, data)], "variants", "unique", "evaluated", "pruned"}.
+    """
+    variants = alignment_variants(panel, orientation, steps)
+    exact = best_grid_offset(roof, panel, border, border, orientation, obstacles)
+    variants.append((ALIGN_X[0], ALIGN_Y[0], exact["offset_x"], exact["offset_y"]))
+    screened, seen = [], set()
+    for k, v in enumerate(variants):
+        base, bound = _screen_variant(roof, panel, border, obstacles, orientation, v)
+        key = (base["start_x"], base["start_y"], base["cols"], base["rows"])
+        if key not in seen:
+            seen.add(key)
+            screened.append((bound, k, v, base))
+    screened.sort(key=lambda t: (-t[0], t[1]))
+
+    top: List[Tuple[int, int, str, dict]] = []   # (N, variant index, label, data)
+    evaluated = 0
+    batch = max(1, workers)
+    while evaluated < len(screened):
+        kth = top[top_k - 1][0] if len(top) >= top_k else -1
+        chunk = [t for t in screened[evaluated:evaluated + batch] if t[0] > kth]
+        if not chunk:
+            break
+        args = [(roof, panel, obstacles, base) for _, _, _, base in chunk]
+        results = pool.map(_finish_variant, args) if pool is not None else map(_finish_variant, args)
+        for (_, k, v, _), data in zip(chunk, results):
+            top.append((data["total_panels"], k, _variant_label(v), data))
+        top.sort(key=lambda t: (-t[0], t[1]))
+        del top[top_k:]
+        evaluated += len(chunk)
+        if len(chunk) < batch:
+            break
+    return {"top": [(n, label, data) for n, _, label, data in top],
+            "variants": len(variants), "unique": len(screened),
+            "evaluated": evaluated, "pruned": len(screened) - evaluated}
 
 
 # ---------- main execution ----------
@@ -100,58 +176,38 @@ if __name__ == "__main__":
     orientation = choice["orientation"]
     print(f"[CONFIG] Base orientation={orientation}, N_base={choice['N']}")
 
-    # 2. Evaluate all 9 alignment options and store top-3
-    print("[Optimizing] Trying 9 layout alignment 'generations'...")
-    align_x_opts = ["left", "center", "right"]
-    align_y_opts = ["top", "center", "bottom"]  # 'top' = near ridge
-
-    # Store (N_total, align_x, align_y, data_L, data_R)
-    best_variants: List[Tuple[int, str, str, dict, dict]] = []
-    
-    for align_x in align_x_opts:
-        for align_y in align_y_opts:
-            # A. Build base grid
-            base_L = fill_roof_with_panels(
-                roof_left, panel_base, BORDER, BORDER,
-                orientation=orientation, align_x=align_x, align_y=align_y
-            )
-            base_R = fill_roof_with_panels(
-                roof_right, panel_base, BORDER, BORDER,
-                orientation=orientation, align_x=align_x, align_y=align_y
-            )
-                                           
-            # B. Remove panels colliding with obstacles
-            data_L_variant = fill_with_obstacles(
-                roof_left, panel_base, base_L, obstacles_left
-            )
-            data_R_variant = fill_with_obstacles(
-                roof_right, panel_base, base_R, obstacles_right
-            )
-            
-            # C. Fill gaps with portrait panels
-            data_L_variant = augment_with_gap_portraits(
-                roof_left, panel_base, data_L_variant, obstacles_left
-            )
-            data_R_variant = augment_with_gap_portraits(
-                roof_right, panel_base, data_R_variant, obstacles_right
-            )
-            
-            # D. Count results
-            N_total = (
-                data_L_variant["total_panels"]
-                + data_R_variant["total_panels"]
-            )
-            print(f"  [Variant] align=({align_x}, {align_y}), N_Total={N_total}")
-            
-            result = (N_total, align_x, align_y, data_L_variant, data_R_variant)
-            best_variants.append(result)
-            
-            # Keep only top-3
-            best_variants.sort(key=lambda x: x[0], reverse=True)
-            best_variants = best_variants[:3]
-            
-
-    # Select the best layout out of the 9 "generations"
+    # 2. Evaluate the alignment variants (9 named + dense sub-pitch offsets) per side
+    ap = argparse.ArgumentParser(description="Grid layout with an alignment/offset variant search.")
+    ap.add_argument("--steps", type=int, default=8, help="offset sweep: steps x steps grid phases")
+    ap.add_argument("--workers", type=int, default=1, help="processes evaluating variants")
+    args = ap.parse_args()
+    print(f"[Optimizing] Trying 9 alignments + {args.steps}x{args.steps} offsets + the exact best offset per side...")
+
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        found = {
+            side: search_alignments(roof, panel_base, BORDER, obstacles, orientation,
+                                    steps=args.steps, pool=pool, workers=args.workers)
+            for side, roof, obstacles in (("L", roof_left, obstacles_left),
+                                          ("R", roof_right, obstacles_right))
+        }
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    for side, res in found.items():
+        print(f"  [{side}] variants={res['variants']}, unique={res['unique']}, "
+              f"evaluated={res['evaluated']}, pruned={res['pruned']}")
+        for n, label, _ in res["top"]:
+            print(f"    [Variant] {label}: N={n}")
+
+    # sides are independent: rank the combinations of each side's top variants
+    # Store (N_total, label_L, label_R, data_L, data_R)
+    best_variants: List[Tuple[int, str, str, dict, dict]] = sorted(
+        ((nL + nR, labL, labR, dL, dR)
+         for nL, labL, dL in found["L"]["top"] for nR, labR, dR in found["R"]["top"]),
+        key=lambda x: x[0], reverse=True)[:3]
+
+    # Select the best layout
     data_L, data_R = best_variants[0][3], best_variants[0][4]
     best_N = best_variants[0][0]
     print(f"[Optimizing] Best layout found with N_Total={best_N} panels.")
@@ -175,6 +231,7 @@ if __name__ == "__main__":
     )
     
     # NEW CALL: plot the top-3 variants on one comparison grid
+    from plotter_top_view import draw_comparison_grid  # lazy: matplotlib
     draw_comparison_grid(
         roof_left, roof_right, panel_for_plot,
         obstacles_left, obstacles_right,
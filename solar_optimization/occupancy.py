@@ -0,0 +1,315 @@
+# occupancy.py
+"""
+Occupancy-raster engine for arbitrary obstacle shapes.
+
+The roof is rasterized once at a fixed resolution (mm per cell): the border
+strip and every obstacle (rectangle, circle or polygon, grown by its
+clearance) are burned into a cell grid, and a summed-area table (SAT) of it
+answers "is this panel free?" in O(1), independent of the obstacle count.
+
+Cell (i, j) covers [i*res, (i+1)*res) x [j*res, (j+1)*res). Burning is
+conservative: a cell is occupied as soon as the grown obstacle reaches it,
+and a panel queries every cell it touches, so a panel reported free is free
+of the true shapes too. Rectangles and border edges on multiples of res are
+burned exactly, so touching them stays allowed as in geometry.overlap.
+
+Obstacle shapes (ObstacleCfg.shape):
+    "rect"     x/y/w/h box (default)
+    "circle"   disk inscribed in the x/y/w/h box, radius grown by clearance
+    "polygon"  points [(x, y), ...]; grown by clearance along both axes,
+               the way rectangles are inflated; x/y/w/h is its bounding box
+"""
+
+import math
+from typing import Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: raster and SAT become lists of lists
+    np = None
+
+from geometry import as_array, inflate_obstacle, obstacle_rect, overlap
+
+Rect = Tuple[float, float, float, float]
+
+DEFAULT_RESOLUTION = 50.0   # mm per cell
+_EPS = 1e-9                 # absorbs float noise of coordinates lying on cell edges
+
+
+def _attr(ob, name, default):
+    return ob.get(name, default) if isinstance(ob, dict) else getattr(ob, name, default)
+
+
+def _seg_clip(p, q, x0, y0, x1, y1):
+    """
+    Liang-Barsky clip of segment pq to the closed box: parameters (lo, hi) of
+    the part inside, empty when lo > hi. Works on NumPy arrays of boxes too.
+    """
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    lo, hi = 0.0, 1.0
+    arrays = np is not None
+    for d, a, b0, b1 in ((dx, p[0], x0, x1), (dy, p[1], y0, y1)):
+        if d == 0:
+            inside = (a >= b0) & (a <= b1)
+            if arrays and isinstance(inside, np.ndarray):
+                lo = np.where(inside, lo, 2.0)
+            elif not inside:
+                lo = 2.0
+            continue
+        t0, t1 = (b0 - a)/d, (b1 - a)/d
+        if d < 0:
+            t0, t1 = t1, t0
+        if arrays:
+            lo, hi = np.maximum(lo, t0), np.minimum(hi, t1)
+        else:
+            lo, hi = max(lo, t0), min(hi, t1)
+    return lo, hi
+
+
+def _seg_hits_box(p, q, x0, y0, x1, y1):
+    """Does segment pq meet the closed box?"""
+    lo, hi = _seg_clip(p, q, x0, y0, x1, y1)
+    return lo <= hi
+
+
+def _inside_polygon(points, x, y):
+    """Even-odd point-in-polygon test (x, y scalars or NumPy arrays)."""
+    inside = False
+    n = len(points)
+    for k in range(n):
+        (ax, ay), (bx, by) = points[k], points[k - 1]
+        if ay == by:
+            continue
+        cross = ((ay > y) != (by > y)) & (x < ax + (y - ay)*(bx - ax)/(by - ay))
+        inside = inside ^ cross
+    return inside
+
+
+def obstacle_hits(ob, rect: Rect) -> bool:
+    """
+    Exact test: does rect overlap the obstacle shape grown by its clearance?
+    Touching is allowed, as in geometry.overlap. The raster is a superset of
+    this (cells are burned when merely touched).
+    """
+    shape = _attr(ob, "shape", "rect") or "rect"
+    x, y, w, h = rect
+    if shape == "rect":
+        return overlap(x, y, w, h, *inflate_obstacle(ob))
+    c = _attr(ob, "clearance", 0.0) or 0.0
+    if shape == "circle":
+        ox, oy, ow, oh = obstacle_rect(ob)
+        cx, cy, radius = ox + ow/2, oy + oh/2, min(ow, oh)/2 + c
+        dx = max(x - cx, cx - (x + w), 0.0)
+        dy = max(y - cy, cy - (y + h), 0.0)
+        return dx*dx + dy*dy < radius*radius
+    if shape != "polygon":
+        raise ValueError(f"shape must be rect|circle|polygon, got {shape!r}")
+    pts = [(float(px), float(py)) for px, py in _attr(ob, "points", None) or ()]
+    x0, y0, x1, y1 = x - c, y - c, x + w + c, y + h + c
+    if _inside_polygon(pts, (x0 + x1)/2, (y0 + y1)/2):
+        return True
+    for k in range(len(pts)):
+        p, q = pts[k - 1], pts[k]
+        lo, hi = _seg_clip(p, q, x0, y0, x1, y1)
+        if lo <= hi:
+            # the clipped chord enters the open box iff its midpoint does
+            t = (lo + hi)/2
+            mx, my = p[0] + t*(q[0] - p[0]), p[1] + t*(q[1] - p[1])
+            if x0 < mx < x1 and y0 < my < y1:
+                return True
+    return False
+
+
+class OccupancyGrid:
+    """Occupancy raster of one roof side with an O(1) summed-area-table query (see module doc)."""
+
+    def __init__(self, length: float, width: float, resolution: float = DEFAULT_RESOLUTION):
+        if resolution <= 0:
+            raise ValueError(f"resolution must be > 0, got {resolution!r}")
+        self.length, self.width, self.res = length, width, float(resolution)
+        self.nx = max(1, math.ceil(length/self.res - _EPS))
+        self.ny = max(1, math.ceil(width/self.res - _EPS))
+        if np is not None:
+            self.cells = np.zeros((self.ny, self.nx), dtype=np.uint8)
+        else:
+            self.cells = [bytearray(self.nx) for _ in range(self.ny)]
+        self._sat = None
+
+    @classmethod
+    def from_roof(cls, roof, border_x: float = 0, border_y: float = 0, obstacles=None,
+                  resolution: float = DEFAULT_RESOLUTION) -> "OccupancyGrid":
+        """Raster of a roof with its border strip and obstacles burned in."""
+        grid = cls(roof.length, roof.width, resolution)
+        grid.burn_border(border_x, border_y)
+        for ob in obstacles or []:
+            grid.burn_obstacle(ob)
+        return grid
+
+    # ----- burning -----
+    def _span(self, lo: float, hi: float, n: int) -> Tuple[int, int]:
+        """Cells [i0, i1) whose interior meets (lo, hi), clamped to the raster."""
+        return (max(0, math.floor(lo/self.res + _EPS)),
+                min(n, math.ceil(hi/self.res - _EPS)))
+
+    def _mark(self, i0, i1, j0, j1, flags=None) -> None:
+        """Occupy cells [i0,i1) x [j0,j1), or only those where flags[j-j0][i-i0] is set."""
+        if i0 >= i1 or j0 >= j1:
+            return
+        self._sat = None
+        if np is not None:
+            block = self.cells[j0:j1, i0:i1]
+            block |= 1 if flags is None else flags.astype(np.uint8)
+            return
+        for j in range(j0, j1):
+            row = self.cells[j]
+            for i in range(i0, i1):
+                if flags is None or flags[j - j0][i - i0]:
+                    row[i] = 1
+
+    def _cell_boxes(self, i0, i1, j0, j1):
+        """Cell bounds x0, y0, x1, y1 of the block: NumPy (rows, cols) grids or nested lists."""
+        r = self.res
+        if np is not None:
+            x0 = np.arange(i0, i1)[None, :]*r
+            y0 = np.arange(j0, j1)[:, None]*r
+            return x0, y0, x0 + r, y0 + r
+        return ([[i*r for i in range(i0, i1)] for _ in range(j0, j1)],
+                [[j*r for _ in range(i0, i1)] for j in range(j0, j1)],
+                [[(i + 1)*r for i in range(i0, i1)] for _ in range(j0, j1)],
+                [[(j + 1)*r for _ in range(i0, i1)] for j in range(j0, j1)])
+
+    def _flags(self, i0, i1, j0, j1, test):
+        """test(x0, y0, x1, y1) over every cell of the block (vectorized with NumPy)."""
+        x0, y0, x1, y1 = self._cell_boxes(i0, i1, j0, j1)
+        if np is not None:
+            return np.broadcast_to(test(x0, y0, x1, y1), (j1 - j0, i1 - i0))
+        return [[test(a, b, c, d) for a, b, c, d in zip(*rows)] for rows in zip(x0, y0, x1, y1)]
+
+    def burn_rect(self, rect: Rect) -> None:
+        x, y, w, h = rect
+        i0, i1 = self._span(x, x + w, self.nx)
+        j0, j1 = self._span(y, y + h, self.ny)
+        self._mark(i0, i1, j0, j1)
+
+    def burn_border(self, border_x: float, border_y: float) -> None:
+        """Occupy everything outside the usable box (and the partial cell past the roof edge)."""
+        L, W = self.length, self.width
+        for rect in ((-1, -1, border_x + 1, W + 2), (L - border_x, -1, border_x + 1 + self.nx*self.res, W + 2),
+                     (-1, -1, L + 2, border_y + 1), (-1, W - border_y, L + 2, border_y + 1 + self.ny*self.res)):
+            self.burn_rect(rect)
+
+    def burn_circle(self, cx: float, cy: float, radius: float) -> None:
+        """Occupy cells reached by the open disk (a cell touching it stays free)."""
+        i0, i1 = self._span(cx - radius, cx + radius, self.nx)
+        j0, j1 = self._span(cy - radius, cy + radius, self.ny)
+        if i0 >= i1 or j0 >= j1:
+            return
+        mx = np.maximum if np is not None else max
+
+        def test(x0, y0, x1, y1):
+            dx = mx(mx(x0 - cx, cx - x1), 0.0)
+            dy = mx(mx(y0 - cy, cy - y1), 0.0)
+            return dx*dx + dy*dy < radius*radius
+        self._mark(i0, i1, j0, j1, self._flags(i0, i1, j0, j1, test))
+
+    def burn_polygon(self, points: Sequence[Tuple[float, float]], clearance: float = 0.0) -> None:
+        """
+        Occupy cells within clearance (per axis) of the polygon: a cell grown by
+        clearance is hit when an edge crosses it or its centre lies inside.
+        """
+        pts = [(float(px), float(py)) for px, py in points]
+        if len(pts) < 3:
+            raise ValueError("a polygon needs at least 3 points")
+        c = clearance
+        xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+        i0, i1 = self._span(min(xs) - c, max(xs) + c, self.nx)
+        j0, j1 = self._span(min(ys) - c, max(ys) + c, self.ny)
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        def test(x0, y0, x1, y1):
+            x0, y0, x1, y1 = x0 - c, y0 - c, x1 + c, y1 + c
+            hit = _inside_polygon(pts, (x0 + x1)/2, (y0 + y1)/2)
+            for k in range(len(pts)):
+                hit = hit | _seg_hits_box(pts[k - 1], pts[k], x0, y0, x1, y1)
+            return hit
+        self._mark(i0, i1, j0, j1, self._flags(i0, i1, j0, j1, test))
+
+    def burn_obstacle(self, ob) -> None:
+        """Burn an obstacle object or dict by its shape, grown by its clearance."""
+        shape = _attr(ob, "shape", "rect") or "rect"
+        c = _attr(ob, "clearance", 0.0) or 0.0
+        if shape == "rect":
+            self.burn_rect(inflate_obstacle(ob))
+        elif shape == "circle":
+            x, y, w, h = obstacle_rect(ob)
+            self.burn_circle(x + w/2, y + h/2, min(w, h)/2 + c)
+        elif shape == "polygon":
+            points = _attr(ob, "points", None)
+            if not points:
+                raise ValueError("polygon obstacle needs points")
+            self.burn_polygon(points, c)
+        else:
+            raise ValueError(f"shape must be rect|circle|polygon, got {shape!r}")
+
+    # ----- queries -----
+    @property
+    def sat(self):
+        """(ny+1, nx+1) summed-area table of the raster, rebuilt lazily after burning."""
+        if self._sat is None:
+            if np is not None:
+                sat = np.zeros((self.ny + 1, self.nx + 1), dtype=np.int64)
+                np.cumsum(np.cumsum(self.cells, axis=0), axis=1, out=sat[1:, 1:])
+            else:
+                sat = [[0]*(self.nx + 1)]
+                for row in self.cells:
+                    prev, acc, line = sat[-1], 0, [0]
+                    for i, v in enumerate(row):
+                        acc += v
+                        line.append(prev[i + 1] + acc)
+                    sat.append(line)
+            self._sat = sat
+        return self._sat
+
+    def _window(self, x, y, w, h):
+        """Cell window [i0,i1) x [j0,j1) touched by the rect, or None if it leaves the raster."""
+        i0, i1 = math.floor(x/self.res + _EPS), math.ceil((x + w)/self.res - _EPS)
+        j0, j1 = math.floor(y/self.res + _EPS), math.ceil((y + h)/self.res - _EPS)
+        if i0 < 0 or j0 < 0 or i1 > self.nx or j1 > self.ny:
+            return None
+        return i0, i1, j0, j1
+
+    def occupied_cells(self, x: float, y: float, w: float, h: float) -> Optional[int]:
+        """Occupied cells under the rect (None if it leaves the roof)."""
+        win = self._window(x, y, w, h)
+        if win is None:
+            return None
+        i0, i1, j0, j1 = win
+        s = self.sat
+        return int(s[j1][i1] - s[j0][i1] - s[j1][i0] + s[j0][i0])
+
+    def is_free(self, x: float, y: float, w: float, h: float) -> bool:
+        """True if the rect lies on the roof and touches no occupied cell (O(1))."""
+        return self.occupied_cells(x, y, w, h) == 0
+
+    def free_many(self, rects):
+        """(N,) flags of is_free for rects (list of tuples, (N, 4) array or Layout)."""
+        if np is None:
+            return [self.is_free(*r) for r in rects]
+        r = as_array(rects)
+        if len(r) == 0:
+            return np.zeros(0, dtype=bool)
+        i0 = np.floor(r[:, 0]/self.res + _EPS).astype(np.int64)
+        j0 = np.floor(r[:, 1]/self.res + _EPS).astype(np.int64)
+        i1 = np.ceil((r[:, 0] + r[:, 2])/self.res - _EPS).astype(np.int64)
+        j1 = np.ceil((r[:, 1] + r[:, 3])/self.res - _EPS).astype(np.int64)
+        on_roof = (i0 >= 0) & (j0 >= 0) & (i1 <= self.nx) & (j1 <= self.ny)
+        i0, i1 = np.clip(i0, 0, self.nx), np.clip(i1, 0, self.nx)
+        j0, j1 = np.clip(j0, 0, self.ny), np.clip(j1, 0, self.ny)
+        s = self.sat
+        return on_roof & (s[j1, i1] - s[j0, i1] - s[j1, i0] + s[j0, i0] == 0)
+
+    def free_fraction(self) -> float:
+        """Share of raster cells that are free."""
+        s = self.sat
+        return 1.0 - float(s[-1][-1])/(self.nx*self.ny)
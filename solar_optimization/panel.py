@@ -1,4 +1,13 @@
-from typing import List, Tuple
+import math
+from functools import lru_cache
+
+from layout import Layout
+from geometry import overlap, inflate, inflate_obstacle
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: the pure-Python paths below still work
+    np = None
 
 class Panel:
     def __init__(self, width, height, gap_x=0, gap_y=0, clamp_margin=30):
@@ -9,6 +18,21 @@ class Panel:
         self.clamp_margin = clamp_margin
 
 # ---------- GRID ----------
+# Lattice geometry is a pure function of (L, W, margins, gaps, panel size), and
+# roof sides, alignment variants, GA slot scans and batch roofs keep asking for
+# the same few combinations, so it is memoized in bounded LRU caches.
+LATTICE_CACHE_SIZE = 1024
+
+# every memoized lattice/slot function, here and in other modules
+_LATTICE_CACHES: list = []
+
+def register_lattice_cache(fn):
+    """Add an lru_cache'd function to lattice_cache_stats()/clear_lattice_cache()."""
+    _LATTICE_CACHES.append(fn)
+    return fn
+
+@register_lattice_cache
+@lru_cache(maxsize=LATTICE_CACHE_SIZE)
 def _lattice_counts(L, W, m_x, m_y, gx, gy, w, h):
     """
     Compute lattice counts and geometry:
@@ -32,23 +56,91 @@ def _lattice_counts(L, W, m_x, m_y, gx, gy, w, h):
     cov = (N*w*h)/(L_eff*W_eff) if L_eff>0 and W_eff>0 else 0.0
     return nx, ny, N, cov, sx, sy
 
+@register_lattice_cache
+@lru_cache(maxsize=LATTICE_CACHE_SIZE)
+def _best_orientation(L, W, m_x, m_y, gx, gy, w_portrait, h_portrait):
+    nx_p, ny_p, N_p, cov_p, *_ = _lattice_counts(L, W, m_x, m_y, gx, gy, w_portrait, h_portrait)
+    nx_l, ny_l, N_l, cov_l, *_ = _lattice_counts(L, W, m_x, m_y, gx, gy, h_portrait, w_portrait)
+    if N_l > N_p:
+        return ("landscape", h_portrait, w_portrait, nx_l, ny_l, N_l, cov_l)
+    return ("portrait", w_portrait, h_portrait, nx_p, ny_p, N_p, cov_p)
+
 def best_orientation(L, W, m_x, m_y, gx, gy, w_portrait=1000, h_portrait=1700):
     """
     Compare portrait vs landscape orientations and return best option.
-    Returns a dict with orientation, chosen w/h, nx, ny, N and coverage efficiency.
+    Returns a dict with orientation, chosen w/h, nx, ny, N and coverage efficiency
+    (a fresh dict per call; the comparison itself is memoized).
     """
-    nx_p, ny_p, N_p, cov_p, *_ = _lattice_counts(L, W, m_x, m_y, gx, gy, w_portrait, h_portrait)
-    nx_l, ny_l, N_l, cov_l, *_ = _lattice_counts(L, W, m_x, m_y, gx, gy, h_portrait, w_portrait)
-    if N_l > N_p:
-        return {"orientation":"landscape","w":h_portrait,"h":w_portrait,
-                "nx":nx_l,"ny":ny_l,"N":N_l,"coverage_eff":cov_l}
+    ori, w, h, nx, ny, N, cov = _best_orientation(L, W, m_x, m_y, gx, gy, w_portrait, h_portrait)
+    return {"orientation":ori,"w":w,"h":h,"nx":nx,"ny":ny,"N":N,"coverage_eff":cov}
+
+@register_lattice_cache
+@lru_cache(maxsize=LATTICE_CACHE_SIZE)
+def lattice_cells(L, W, m_x, m_y, gx, gy, w, h):
+    """
+    Every cell of the centred lattice as (x, y, w, h), row-major.
+    Memoized template shared between callers: treat it as read-only.
+    """
+    nx, ny, _, _, sx, sy = _lattice_counts(L, W, m_x, m_y, gx, gy, w, h)
+    return tuple((sx + c*(w+gx), sy + r*(h+gy), w, h) for r in range(ny) for c in range(nx))
+
+def lattice_cache_stats() -> dict:
+    """Hits/misses/size per lattice cache, in the shape of the GA fitness cache stats."""
+    out = {}
+    for fn in _LATTICE_CACHES:
+        info = fn.cache_info()
+        total = info.hits + info.misses
+        out[fn.__name__] = {"hits": info.hits, "misses": info.misses, "size": info.currsize,
+                            "maxsize": info.maxsize, "hit_rate": info.hits / total if total else 0.0}
+    return out
+
+def clear_lattice_cache() -> None:
+    for fn in _LATTICE_CACHES:
+        fn.cache_clear()
+
+ALIGN_X = ("left", "center", "right")
+ALIGN_Y = ("top", "center", "bottom")   # "top" = next to the ridge (y = 0)
+
+def _align_axis(length, m, g, size, n, centered, align, offset, names):
+    """
+    Start and count along one axis. align picks the start (first/centered/last
+    position inside the margins); a non-zero offset then shifts the lattice
+    start + k*pitch and keeps every cell that fits, so any sub-pitch offset
+    still gives a full grid (possibly one cell fewer).
+    """
+    if align == names[0]:
+        start = m
+    elif align == "center":
+        start = centered
+    elif align == names[2]:
+        start = length - m - (n*size + max(n-1, 0)*g)
     else:
-        return {"orientation":"portrait","w":w_portrait,"h":h_portrait,
-                "nx":nx_p,"ny":ny_p,"N":N_p,"coverage_eff":cov_p}
+        raise ValueError(f"align must be {'|'.join(names)}, got {align!r}")
+    if offset:
+        pitch = size + g
+        start += offset
+        start = max(m, start + math.ceil((m - start)/pitch - 1e-9)*pitch)  # first lattice position inside
+        n = max(0, int((length - m - start + g)//pitch + 1e-9))
+    return start, n
 
-def fill_roof_with_panels(roof, panel, border_x=0, border_y=0, orientation="auto"):
+@register_lattice_cache
+@lru_cache(maxsize=LATTICE_CACHE_SIZE)
+def _aligned_lattice(L, W, m_x, m_y, gx, gy, w, h, align_x, align_y, offset_x, offset_y):
+    """_lattice_counts for an aligned / offset grid (same return tuple)."""
+    nx, ny, N, cov, sx, sy = _lattice_counts(L, W, m_x, m_y, gx, gy, w, h)
+    if N == 0:
+        return nx, ny, N, cov, sx, sy
+    sx, nx = _align_axis(L, m_x, gx, w, nx, sx, align_x, offset_x, ALIGN_X)
+    sy, ny = _align_axis(W, m_y, gy, h, ny, sy, align_y, offset_y, ALIGN_Y)
+    N = nx*ny
+    return nx, ny, N, (N*w*h)/((L - 2*m_x)*(W - 2*m_y)), sx, sy
+
+def fill_roof_with_panels(roof, panel, border_x=0, border_y=0, orientation="auto",
+                          align_x="center", align_y="center", offset_x=0.0, offset_y=0.0):
     """
     Create a regular grid of panels on the roof according to the chosen orientation and borders.
+    align_x: left|center|right, align_y: top|center|bottom (top = ridge side);
+    offset_x/offset_y shift the grid by any amount (mm), typically a fraction of the pitch.
     Returns dictionary with rows, cols, total_panels, coverage, border/start positions and panel sizes.
     """
     if orientation=="auto":
@@ -63,59 +155,172 @@ def fill_roof_with_panels(roof, panel, border_x=0, border_y=0, orientation="auto
         else:
             raise ValueError("orientation must be auto|portrait|landscape")
         ori = orientation
-    nx, ny, N, cov, sx, sy = _lattice_counts(roof.length, roof.width, border_x, border_y,
-                                             panel.gap_x, panel.gap_y, w, h)
+    if (align_x, align_y, offset_x, offset_y) == ("center", "center", 0, 0):
+        nx, ny, N, cov, sx, sy = _lattice_counts(roof.length, roof.width, border_x, border_y,
+                                                 panel.gap_x, panel.gap_y, w, h)
+    else:
+        nx, ny, N, cov, sx, sy = _aligned_lattice(roof.length, roof.width, border_x, border_y,
+                                                  panel.gap_x, panel.gap_y, w, h,
+                                                  align_x, align_y, offset_x, offset_y)
     return {"rows":ny,"cols":nx,"total_panels":N,"coverage_eff":cov,
             "border_x":border_x,"border_y":border_y,"start_x":sx,"start_y":sy,
-            "panel_w":w,"panel_h":h,"orientation":ori}
+            "panel_w":w,"panel_h":h,"orientation":ori,
+            "align_x":align_x,"align_y":align_y,"offset_x":offset_x,"offset_y":offset_y}
 
 # ---------- OBSTACLES (GRID mask) ----------
-def _overlap(ax, ay, aw, ah, bx, by, bw, bh)->bool:
-    """Return True if rect A overlaps rect B."""
-    return not (ax+aw<=bx or bx+bw<=ax or ay+ah<=by or by+bh<=ay)
+def _grid_free_cells_np(sx, sy, nx, ny, w, h, gx, gy, masks):
+    """
+    NumPy path of fill_with_obstacles: build the cell origins once and intersect
+    all cells with the (M,4) mask array in a single broadcast.
+    Returns a Layout of the free cells (with row/col) in the same row-major order as the loop.
+    """
+    xs = sx + np.arange(nx) * (w + gx)
+    ys = sy + np.arange(ny) * (h + gy)
+    m = np.asarray(masks, dtype=float).reshape(-1, 4)
+    mx, my, mw, mh = m[:, 0], m[:, 1], m[:, 2], m[:, 3]
+    # per-axis overlap against every mask: (nx, M) and (ny, M)
+    ox = ~((xs[:, None] + w <= mx) | (mx + mw <= xs[:, None]))
+    oy = ~((ys[:, None] + h <= my) | (my + mh <= ys[:, None]))
+    blocked = (oy[:, None, :] & ox[None, :, :]).any(axis=2)   # (ny, nx)
+    rr, cc = np.nonzero(~blocked)
+    return Layout.from_columns(xs[cc], ys[rr], w, h, row=rr, col=cc)
 
-def _inflate_rect_any(ob):
+def blocked_cells(data, panel, obstacles) -> set:
     """
-    Accept either an object with inflated() method or a dict-like obstacle.
-    Return inflated rectangle (x, y, w, h) applying clearance.
+    (row, col) of the base grid cells that fill_with_obstacles would drop,
+    without building the layout: each mask only visits the columns and rows
+    it spans (cheap screening of many grid variants).
     """
-    if hasattr(ob, "inflated"):
-        return ob.inflated()
-    x,y,w,h = ob["x"], ob["y"], ob["w"], ob["h"]
-    c = ob.get("clearance", 0.0)
-    return (x-c, y-c, w+2*c, h+2*c)
+    sx, sy = data["start_x"], data["start_y"]
+    w, h   = data["panel_w"], data["panel_h"]
+    xs = [sx + c*(w+panel.gap_x) for c in range(data["cols"])]
+    ys = [sy + r*(h+panel.gap_y) for r in range(data["rows"])]
+    out = set()
+    for (mx, my, mw, mh) in (inflate_obstacle(ob) for ob in (obstacles or [])):
+        cols = [c for c, x in enumerate(xs) if not (x + w <= mx or mx + mw <= x)]
+        rows = [r for r, y in enumerate(ys) if not (y + h <= my or my + mh <= y)] if cols else []
+        out.update((r, c) for r in rows for c in cols)
+    return out
 
 def fill_with_obstacles(roof, panel, data, obstacles):
     """
     From the base grid data remove cells that collide with obstacles.
-    Returns updated layout with placed_rects list and total_panels count.
+    Uses a vectorized NumPy path when available, otherwise the plain loop.
+    Returns updated layout with placed_rects (a Layout) and total_panels count.
     """
     sx, sy = data["start_x"], data["start_y"]
     nx, ny = data["cols"], data["rows"]
     w, h   = data["panel_w"], data["panel_h"]
     gx, gy = panel.gap_x, panel.gap_y
-    masks = [_inflate_rect_any(ob) for ob in (obstacles or [])]
-    placed: List[Tuple[float,float,float,float]] = []
-    for r in range(ny):
-        y = sy + r*(h+gy)
-        for c in range(nx):
-            x = sx + c*(w+gx)
-            if all(not _overlap(x,y,w,h, mx,my,mw,mh) for (mx,my,mw,mh) in masks):
-                placed.append((x,y,w,h))
+    masks = [inflate_obstacle(ob) for ob in (obstacles or [])]
+    placed = Layout()
+    if np is not None and masks and nx > 0 and ny > 0:
+        placed = _grid_free_cells_np(sx, sy, nx, ny, w, h, gx, gy, masks)
+    else:
+        for r in range(ny):
+            y = sy + r*(h+gy)
+            for c in range(nx):
+                x = sx + c*(w+gx)
+                if all(not overlap(x,y,w,h, mx,my,mw,mh) for (mx,my,mw,mh) in masks):
+                    placed.append(x, y, w, h, r, c)
     out = dict(data)
     out["placed_rects"] = placed
     out["total_panels"] = len(placed)
     return out
 
-# ---------- POST: recenter + portrait columns ----------
-def _inflate_rect_gap(rect, gx, gy):
-    x,y,w,h = rect
-    return (x-gx, y-gy, w+2*gx, h+2*gy)
+# ---------- OFFSET OPTIMIZATION (breakpoint enumeration) ----------
+# Along one axis the lattice is start = m + phase + k*pitch, phase in [0, pitch).
+# Which cells fit and which ones a mask hits only changes when a cell edge
+# meets a border or mask edge, so only those phases (the breakpoints) matter.
+# Overlap is strict and fitting is not, so each cell is usable on a closed set
+# of phases: the count is upper semicontinuous and its maximum is reached at a
+# pair of breakpoints. Evaluating that product grid is therefore exact.
+
+def _axis_configs(length, m, g, size, n0, centered, edges, names):
+    """
+    Distinct lattice configurations along one axis:
+    [(phase, start, n, hits)], hits[j] being the bitmask of cells that overlap
+    the j-th (lo, hi) mask interval. Phases giving the same n and hits are merged.
+    """
+    pitch = size + g
+    phases = {0.0, (length - 2*m - size) % pitch}
+    for lo, hi in edges:
+        phases.add((lo - size - m) % pitch)
+        phases.add((hi - m) % pitch)
+    out = {}
+    for phase in sorted(phases):
+        start, n = _align_axis(length, m, g, size, n0, centered, names[0], phase, names)
+        pos = [start + k*pitch for k in range(n)]
+        hits = tuple(sum(1 << k for k, p in enumerate(pos) if not (p + size <= lo or hi <= p))
+                     for lo, hi in edges)
+        out.setdefault((n, hits), (phase, start, n, hits))
+    return list(out.values())
+
+def _free_counts(cx, cy, n_masks):
+    """(len(cy), len(cx)) free-cell counts of every pair of axis configurations."""
+    if np is not None and n_masks:
+        kx = max(n for _, _, n, _ in cx) or 1
+        ky = max(n for _, _, n, _ in cy) or 1
+        bits = lambda hits, k: [[(b >> i) & 1 for b in hits] for i in range(k)]
+        X = np.array([bits(h, kx) for *_, h in cx], dtype=float).reshape(len(cx) * kx, n_masks)
+        Y = np.array([bits(h, ky) for *_, h in cy], dtype=float)            # (By, ky, M)
+        nx = np.array([n for _, _, n, _ in cx])
+        counts = np.empty((len(cy), len(cx)), dtype=int)
+        for b, (_, _, ny, _) in enumerate(cy):
+            blocked = (Y[b] @ X.T > 0).reshape(ky, len(cx), kx).sum(axis=(0, 2))
+            counts[b] = nx*ny - blocked
+        return counts.tolist()
+    counts = []
+    for _, _, ny, hy in cy:
+        row = []
+        for _, _, nx, hx in cx:
+            blocked = 0
+            for r in range(ny):
+                cols = 0
+                for j in range(n_masks):
+                    if (hy[j] >> r) & 1:
+                        cols |= hx[j]
+                blocked += bin(cols).count("1")
+            row.append(nx*ny - blocked)
+        counts.append(row)
+    return counts
+
+def best_grid_offset(roof, panel, border_x=0, border_y=0, orientation="auto", obstacles=None):
+    """
+    Grid offset (offset_x, offset_y from the left/top border) that keeps the
+    most cells after fill_with_obstacles, found exactly by evaluating the
+    breakpoint configurations only. Ties go to the smallest offset_y, then offset_x.
+    Returns the fill_with_obstacles result for that grid plus
+    "breakpoints": (distinct x, distinct y configurations).
+    """
+    base = fill_roof_with_panels(roof, panel, border_x, border_y, orientation)
+    if base["total_panels"] == 0:
+        out = fill_with_obstacles(roof, panel, base, obstacles)
+        out["breakpoints"] = (0, 0)
+        return out
+    L, W = roof.length, roof.width
+    w, h = base["panel_w"], base["panel_h"]
+    gx, gy = panel.gap_x, panel.gap_y
+    # masks outside the usable box can never block a cell
+    masks = [(mx, my, mw, mh) for (mx, my, mw, mh) in (inflate_obstacle(ob) for ob in (obstacles or []))
+             if overlap(mx, my, mw, mh, border_x, border_y, L - 2*border_x, W - 2*border_y)]
+    cx = _axis_configs(L, border_x, gx, w, base["cols"], base["start_x"],
+                       [(mx, mx + mw) for mx, _, mw, _ in masks], ALIGN_X)
+    cy = _axis_configs(W, border_y, gy, h, base["rows"], base["start_y"],
+                       [(my, my + mh) for _, my, _, mh in masks], ALIGN_Y)
+    counts = _free_counts(cx, cy, len(masks))
+    _, b, a = min((-n, b, a) for b, row in enumerate(counts) for a, n in enumerate(row))
+    data = fill_roof_with_panels(roof, panel, border_x, border_y, base["orientation"],
+                                 ALIGN_X[0], ALIGN_Y[0], cx[a][0], cy[b][0])
+    out = fill_with_obstacles(roof, panel, data, obstacles)
+    out["breakpoints"] = (len(cx), len(cy))
+    return out
 
+# ---------- POST: recenter + portrait columns ----------
 def _can_place(x, y, w, h, masks):
     """Return True if rectangle (x,y,w,h) does not overlap any mask in masks."""
     for (mx,my,mw,mh) in masks:
-        if _overlap(x,y,w,h, mx,my,mw,mh):
+        if overlap(x,y,w,h, mx,my,mw,mh):
             return False
     return True
 
@@ -158,8 +363,8 @@ def _place_portrait_columns(side, roof, panel, data_with_rects, obstacles, max_c
     pw, ph = panel.width, panel.height  # portrait
     masks = []
     for ob in (obstacles or []):
-        masks.append(_inflate_rect_any(ob))
-    masks += [_inflate_rect_gap(r, gx, gy) for r in data_with_rects.get("placed_rects", [])]
+        masks.append(inflate_obstacle(ob))
+    masks += [inflate(r, gx, gy) for r in data_with_rects.get("placed_rects", [])]
     cols_x = [ (bx + i*(pw+gx)) if side=="left" else (L - bx - pw - i*(pw+gx)) for i in range(max_cols) ]
     best_added = []
     for y_off in (0.0, (ph+gy)/2.0):
@@ -170,7 +375,7 @@ def _place_portrait_columns(side, roof, panel, data_with_rects, obstacles, max_c
             while y + ph <= W - by + 1e-9:
                 if _can_place(xP, y, pw, ph, loc_masks):
                     added.append((xP, y, pw, ph))
-                    loc_masks.append(_inflate_rect_gap((xP, y, pw, ph), gx, gy))
+                    loc_masks.append(inflate((xP, y, pw, ph), gx, gy))
                 y += ph + gy
         if len(added) > len(best_added):
             best_added = added
@@ -242,29 +447,35 @@ def augment_with_gap_portraits(roof, panel, data, obstacles=None):
     """
     After base GRID+obstacles, scan each Y-row and pack portrait panels (e.g. 1000x1700)
     into any free X-intervals. Try two vertical offsets: 0 and (h+gap)/2 and choose the best.
+    Masks are swept in y: each strip only sees the masks overlapping it
+    (sorted by bottom edge, expired ones dropped as y grows).
     """
     bx, by = data["border_x"], data["border_y"]
     L, W   = roof.length, roof.width
     gx, gy = panel.gap_x, panel.gap_y
     pw, ph = panel.width, panel.height  # portrait
 
-    # masks: inflated obstacles + already placed panels expanded by gap
+    # masks: inflated obstacles + already placed panels expanded by gap, sorted by bottom y
     base_masks = []
     for ob in (obstacles or []):
-        base_masks.append(_inflate_rect_any(ob))
-    base_masks += [_inflate_rect_gap(r, gx, gy) for r in data.get("placed_rects", [])]
+        base_masks.append(inflate_obstacle(ob))
+    base_masks += [inflate(r, gx, gy) for r in data.get("placed_rects", [])]
+    base_masks.sort(key=lambda m: m[1])
 
     best_added = []
     for y_off in (0.0, (ph + gy)/2.0):
-        masks = list(base_masks)
         added = []
+        active = []   # masks that may still overlap the current or a later strip
+        nxt = 0       # next mask in base_masks not yet admitted
         y = by + y_off
         while y + ph <= W - by + 1e-9:
+            # sweep: admit masks starting below the strip top, drop masks ending at or before y
+            while nxt < len(base_masks) and base_masks[nxt][1] < y + ph:
+                active.append(base_masks[nxt])
+                nxt += 1
+            active = [m for m in active if m[1] + m[3] > y and m[1] < y + ph]
             # blocking intervals in X for strip [y, y+ph]
-            blocks = []
-            for (mx, my, mw, mh) in masks:
-                if not (y + ph <= my or my + mh <= y):
-                    blocks.append((mx, mx + mw))
+            blocks = [(mx, mx + mw) for (mx, my, mw, mh) in active]
             # free intervals and column packing
             for a, b in _free_intervals((bx, L - bx), blocks):
                 length = b - a
@@ -274,9 +485,9 @@ def augment_with_gap_portraits(roof, panel, data, obstacles=None):
                 x0 = a  # align to the left edge of the interval
                 for i in range(k):
                     x = x0 + i * (pw + gx)
-                    if _can_place(x, y, pw, ph, masks):
+                    if _can_place(x, y, pw, ph, active):
                         added.append((x, y, pw, ph))
-                        masks.append(_inflate_rect_gap((x, y, pw, ph), gx, gy))
+                        active.append(inflate((x, y, pw, ph), gx, gy))
             y += ph + gy
         if len(added) > len(best_added):
             best_added = added
@@ -284,7 +495,113 @@ def augment_with_gap_portraits(roof, panel, data, obstacles=None):
     if not best_added:
         return data
     out = dict(data)
-    out["placed_rects"] = list(data.get("placed_rects", [])) + best_added
+    out["placed_rects"] = Layout.of(data.get("placed_rects")) + best_added
     out["total_panels"] = len(out["placed_rects"])
     out["note"] = f"gap-portrait +{len(best_added)}"
     return out
+
+
+# ---------- INCREMENTAL: re-layout after an obstacle delta ----------
+def _touches_window(rect, win):
+    x, y, w, h = rect
+    return overlap(x, y, w, h, *win)
+
+def _pack_gap_portraits_in_window(roof, panel, data, masks, win):
+    """
+    Gap scan of augment_with_gap_portraits limited to window win=(x,y,w,h):
+    only strips and X-intervals inside the window are packed, against masks
+    that touch it. Returns the best list of added portrait rects.
+    """
+    bx, by = data["border_x"], data["border_y"]
+    L, W   = roof.length, roof.width
+    gx, gy = panel.gap_x, panel.gap_y
+    pw, ph = panel.width, panel.height
+    wx, wy, ww, wh = win
+    x_lo, x_hi = max(bx, wx), min(L - bx, wx + ww)
+    best_added = []
+    for y_off in (0.0, (ph + gy)/2.0):
+        loc = list(masks)
+        added = []
+        # first strip of this offset's lattice that reaches into the window
+        k0 = max(0, int((wy - ph - (by + y_off)) // (ph + gy)))
+        y = by + y_off + k0*(ph + gy)
+        while y + ph <= W - by + 1e-9 and y < wy + wh:
+            if y + ph > wy:
+                blocks = [(mx, mx + mw) for (mx, my, mw, mh) in loc
+                          if not (y + ph <= my or my + mh <= y)]
+                for a, b in _free_intervals((x_lo, x_hi), blocks):
+                    k = int((b - a + gx) // (pw + gx))
+                    for i in range(max(k, 0)):
+                        x = a + i*(pw + gx)
+                        if _can_place(x, y, pw, ph, loc):
+                            added.append((x, y, pw, ph))
+                            loc.append(inflate((x, y, pw, ph), gx, gy))
+            y += ph + gy
+        if len(added) > len(best_added):
+            best_added = added
+    return best_added
+
+def relayout_obstacle_delta(roof, panel, data, obstacles, added=None, removed=None):
+    """
+    Update a GRID(+gap portrait) layout after a few obstacles changed, without
+    rerunning the pipeline. obstacles is the full list after the change;
+    added / removed are the changed obstacles (a move = remove old + add new).
+    - panels hit by an added obstacle are dropped;
+    - base grid cells inside the changed footprints (+ gap neighbourhood) are re-tested;
+    - the remaining free space there is refilled with gap-scan portrait panels.
+    Only the window around the change is touched, so the result can differ
+    slightly from a full rerun (which may pick another global strip offset).
+    """
+    added, removed = list(added or []), list(removed or [])
+    if not added and not removed:
+        return data
+    gx, gy = panel.gap_x, panel.gap_y
+    w, h   = data["panel_w"], data["panel_h"]
+    add_masks = [inflate_obstacle(ob) for ob in added]
+    changed   = add_masks + [inflate_obstacle(ob) for ob in removed]
+
+    # 1. drop panels colliding with new/moved obstacles
+    prev = Layout.of(data.get("placed_rects"))
+    keep_idx, dropped = [], []
+    for i, r in enumerate(prev):
+        if any(_touches_window(r, m) for m in add_masks):
+            dropped.append(r)
+        else:
+            keep_idx.append(i)
+    kept = prev.take(keep_idx)
+
+    # 2. affected window: changed footprints and freed panels, grown by the gap
+    area = changed + dropped
+    x0 = min(r[0] for r in area) - gx;          y0 = min(r[1] for r in area) - gy
+    x1 = max(r[0] + r[2] for r in area) + gx;   y1 = max(r[1] + r[3] for r in area) + gy
+    win = (x0, y0, x1 - x0, y1 - y0)
+
+    # local masks: obstacles and gap-expanded panels that touch the (padded) window
+    pad = (x0 - max(w, h) - gx, y0 - max(w, h) - gy,
+           (x1 - x0) + 2*(max(w, h) + gx), (y1 - y0) + 2*(max(w, h) + gy))
+    obst  = [m for m in (inflate_obstacle(ob) for ob in (obstacles or [])) if _touches_window(m, pad)]
+    masks = obst + [inflate(r, gx, gy) for r in kept if _touches_window(r, pad)]
+
+    # 3. re-test base grid cells whose footprint meets the window
+    sx, sy = data["start_x"], data["start_y"]
+    nx, ny = data["cols"], data["rows"]
+    new_rects = Layout()
+    if nx > 0 and ny > 0:
+        c0 = max(0, int((x0 - w - sx) // (w + gx)));  c1 = min(nx - 1, int((x1 - sx) // (w + gx)))
+        r0 = max(0, int((y0 - h - sy) // (h + gy)));  r1 = min(ny - 1, int((y1 - sy) // (h + gy)))
+        for r in range(r0, r1 + 1):
+            y = sy + r*(h+gy)
+            for c in range(c0, c1 + 1):
+                x = sx + c*(w+gx)
+                if overlap(x, y, w, h, *win) and _can_place(x, y, w, h, masks):
+                    new_rects.append(x, y, w, h, r, c)
+                    masks.append(inflate((x, y, w, h), gx, gy))
+
+    # 4. refill what is still free in the window with portrait panels
+    new_rects.extend(_pack_gap_portraits_in_window(roof, panel, data, masks, win))
+
+    out = dict(data)
+    out["placed_rects"] = kept + new_rects
+    out["total_panels"] = len(out["placed_rects"])
+    out["note"] = f"incremental -{len(dropped)} +{len(new_rects)}"
+    return out
@@ -1,22 +1,15 @@
 # plotter_top_view.py
 import os
 import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
+from matplotlib.patches import Circle, Polygon, Rectangle
+
+from geometry import obstacle_rect, inflate_obstacle
 
 ORANGE = "#ff8c00"  # 300 mm border + obstacle clearance
 
 def _inflate_rect(ob):
-    if isinstance(ob, dict):
-        x, y, w, h = ob["x"], ob["y"], ob["w"], ob["h"]
-        c = ob.get("clearance", 0.0)
-        typ = ob.get("type", "generic")
-        params = ob
-    else:
-        x, y, w, h = ob.x, ob.y, ob.w, ob.h
-        c = getattr(ob, "clearance", 0.0)
-        typ = getattr(ob, "type", "generic")
-        params = ob
-    return (x, y, w, h), (x - c, y - c, w + 2*c, h + 2*c), typ, params
+    typ = ob.get("type", "generic") if isinstance(ob, dict) else getattr(ob, "type", "generic")
+    return obstacle_rect(ob), inflate_obstacle(ob), typ, ob
 
 def _draw_obstacles(ax, obstacles):
     for ob in obstacles:
@@ -43,7 +36,14 @@ def _draw_obstacles(ax, obstacles):
             ax.add_patch(Rectangle((x - over, y - over), w + 2*over, h + 2*over,
                                    linewidth=1.2, edgecolor="crimson", facecolor="none"))
         else:
-            ax.add_patch(Rectangle((x, y), w, h, linewidth=1.0, edgecolor="crimson", facecolor="none"))
+            shape = p.get("shape", "rect") if isinstance(p, dict) else getattr(p, "shape", "rect")
+            points = p.get("points") if isinstance(p, dict) else getattr(p, "points", None)
+            if shape == "circle":
+                ax.add_patch(Circle((x + w/2, y + h/2), min(w, h)/2, linewidth=1.0, edgecolor="crimson", facecolor="none"))
+            elif shape == "polygon" and points:
+                ax.add_patch(Polygon(points, closed=True, linewidth=1.0, edgecolor="crimson", facecolor="none"))
+            else:
+                ax.add_patch(Rectangle((x, y), w, h, linewidth=1.0, edgecolor="crimson", facecolor="none"))
 
 def _draw_single_roof(ax, roof, panel, data, obstacles=None, title=None):
     ax.set_xlim(0, roof.length)
@@ -109,3 +109,34 @@ def draw_two_roofs_columns(roof_left, roof_right, panel, data_left, data_right,
     else:
         plt.close(fig)
     return fig
+
+def draw_comparison_grid(roof_left, roof_right, panel, obstacles_left, obstacles_right,
+                         variants, save_path: str = None, show: bool = True):
+    """
+    One row per variant (N_total, label_left, label_right, data_left, data_right),
+    left roof in the first column, right roof in the second.
+    """
+    n = max(1, len(variants))
+    fig, axes = plt.subplots(nrows=n, ncols=2, figsize=(18, 3.6*n), squeeze=False)
+    fig.subplots_adjust(hspace=0.35, wspace=0.12)
+
+    for k, (N, label_L, label_R, data_L, data_R) in enumerate(variants):
+        ax_l, ax_r = axes[k]
+        _draw_single_roof(ax_l, roof_left, panel, data_L, obstacles=obstacles_left,
+                          title=f"#{k+1} N_total={N} | Left: {label_L}, N={data_L['total_panels']}")
+        _draw_single_roof(ax_r, roof_right, panel, data_R, obstacles=obstacles_right,
+                          title=f"#{k+1} N_total={N} | Right: {label_R}, N={data_R['total_panels']}")
+        ax_r.invert_yaxis()
+
+    fig.suptitle(f"Top {len(variants)} alignment variants "
+                 f"(border=300 mm; forbidden zones=orange; gaps: gx={panel.gap_x} mm, gy={panel.gap_y} mm)",
+                 fontsize=10)
+
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        plt.savefig(save_path, dpi=200, bbox_inches="tight")
+    if show:
+        plt.tight_layout(); plt.show()
+    else:
+        plt.close(fig)
+    return fig
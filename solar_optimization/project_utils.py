@@ -1,11 +1,18 @@
 # project_utils.py
-import os
-import csv
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: the validator falls back to a pure-Python sweep
+    np = None
 
 # ! FIX: Import moved here, to the top of the file
 from panel import Panel
+from geometry import overlap, inflate, overlap_matrix, contains_many
+from occupancy import obstacle_hits
+from export import write_csv
 
 # Local obstacle class for rendering and inflated()
 @dataclass
@@ -19,51 +26,142 @@ class Obstacle:
     grid_cols: int = 2
     grid_rows: int = 3
     cap_over: float = 80.0
+    shape: str = "rect"
+    points: Optional[List[Tuple[float, float]]] = None
 
     def inflated(self):
-        c = self.clearance
-        return (self.x - c, self.y - c, self.w + 2*c, self.h + 2*c)
+        return inflate((self.x, self.y, self.w, self.h), self.clearance)
 
 # ---------- layout validator ----------
-def _overlap(ax, ay, aw, ah, bx, by, bw, bh) -> bool:
-    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
+def _violation(check: str, message: str, **info) -> dict:
+    return {"check": check, "message": message, **info}
 
-def assert_layout_valid(roof, border, data, obstacles: List[Obstacle]) -> None:
+def _bad_pairs(a0, a1, b0, b1, ga, gb, tol):
+    """
+    Overlapping / too close panel pairs, found by a sweep over panels sorted
+    by a0: panel i is only compared with the panels that start before its
+    end + ga. ga, gb are the required gaps along axes a and b (None: only
+    overlaps are checked). Returns (i, j, "overlap" | "gap") with i < j.
+    """
+    n = len(a0)
+    order = sorted(range(n), key=a0.__getitem__)
+    starts = [a0[k] for k in order]
+    reach = ga or 0.0
+    out = []
+    for pos, i in enumerate(order):
+        end = bisect_right(starts, a1[i] + reach, pos + 1)
+        for j in order[pos + 1:end]:
+            sep_a = max(a0[j] - a1[i], a0[i] - a1[j])
+            sep_b = max(b0[j] - b1[i], b0[i] - b1[j])
+            if sep_a < 0 and sep_b < 0:
+                out.append((min(i, j), max(i, j), "overlap"))
+            elif ga is not None and sep_a < ga - tol and sep_b < gb - tol:
+                out.append((min(i, j), max(i, j), "gap"))
+    return out
+
+def _bad_pairs_np(a0, a1, b0, b1, ga, gb, tol):
+    """NumPy version of _bad_pairs: all candidate pairs are expanded and tested at once."""
+    n = len(a0)
+    order = np.argsort(a0, kind="stable")
+    pos = np.arange(n)
+    end = np.maximum(np.searchsorted(a0[order], a1[order] + (ga or 0.0), side="right"), pos + 1)
+    counts = end - pos - 1
+    first = np.repeat(pos, counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    i, j = order[first], order[first + 1 + offset]
+    sep_a = np.maximum(a0[j] - a1[i], a0[i] - a1[j])
+    sep_b = np.maximum(b0[j] - b1[i], b0[i] - b1[j])
+    overlap = (sep_a < 0) & (sep_b < 0)
+    if ga is None:
+        bad, gap = overlap, np.zeros_like(overlap)
+    else:
+        gap = ~overlap & (sep_a < ga - tol) & (sep_b < gb - tol)
+        bad = overlap | gap
+    i, j = np.minimum(i, j)[bad].tolist(), np.maximum(i, j)[bad].tolist()
+    return [(p, q, "gap" if g else "overlap") for p, q, g in zip(i, j, gap[bad].tolist())]
+
+def validate_layout(roof, border, data, obstacles: List[Obstacle],
+                    panel: Optional[Panel] = None, tol: float = 1e-6) -> dict:
+    """
+    Check a layout and report every violation instead of stopping at the first:
+    - "border":     panel outside the roof border;
+    - "degenerate": panel with w <= 0 or h <= 0;
+    - "obstacle":   panel overlapping an inflated obstacle (circle/polygon
+                    shapes are tested exactly, not by their bounding box);
+    - "overlap":    two panels overlapping;
+    - "gap":        two panels closer than gap_x AND gap_y (only when panel is
+                    given; the spacing the grid/gap-fill stages keep).
+    Panel pairs come from a sorted sweep along the longer roof axis, so only
+    neighbours are compared (O(n log n) for regular layouts), vectorized with NumPy.
+    Returns {"ok", "panels", "counts": {check: n}, "violations": [...]};
+    each violation has "check", "message", "panel" (index) and "other"/"obstacle".
+    """
     L, W = roof.length, roof.width
-    bx, by = border, border
-    rects = data.get("placed_rects", [])
-    # borders
-    for (x, y, w, h) in rects:
-        if not (x >= bx and y >= by and x + w <= L - bx and y + h <= W - by):
-            raise AssertionError(f"Panel out of border: {(x,y,w,h)}")
-        if w <= 0 or h <= 0:
-            raise AssertionError(f"Degenerate panel: {(x,y,w,h)}")
-    # obstacles
+    inner = (border, border, L - 2*border, W - 2*border)
+    rects = list(data.get("placed_rects", []))
+    n = len(rects)
     masks = [ob.inflated() for ob in obstacles]
-    for (x, y, w, h) in rects:
-        for (mx, my, mw, mh) in masks:
-            if _overlap(x, y, w, h, mx, my, mw, mh):
-                raise AssertionError(f"Collision with obstacle at {(mx,my,mw,mh)} by {(x,y,w,h)}")
+    gx, gy = (panel.gap_x, panel.gap_y) if panel is not None else (0.0, 0.0)
+    violations = []
+
+    if n:
+        xs, ys, ws, hs = (list(c) for c in zip(*rects))
+        if np is not None:
+            xs, ys, ws, hs = (np.asarray(c, dtype=float) for c in (xs, ys, ws, hs))
+            xe, ye = xs + ws, ys + hs
+            arr = np.stack([xs, ys, ws, hs], axis=1)
+            out_idx = np.nonzero(~contains_many(inner, arr))[0].tolist()
+            bad_idx = np.nonzero((ws <= 0) | (hs <= 0))[0].tolist()
+            hits = zip(*(a.tolist() for a in np.nonzero(overlap_matrix(arr, masks)))) if masks else ()
+            pairs_fn = _bad_pairs_np
+        else:
+            xe = [x + w for x, w in zip(xs, ws)]
+            ye = [y + h for y, h in zip(ys, hs)]
+            out_idx = [i for i, ok in enumerate(contains_many(inner, rects)) if not ok]
+            bad_idx = [i for i in range(n) if ws[i] <= 0 or hs[i] <= 0]
+            hits = [(i, k) for i in range(n) for k, (mx, my, mw, mh) in enumerate(masks)
+                    if overlap(xs[i], ys[i], ws[i], hs[i], mx, my, mw, mh)]
+            pairs_fn = _bad_pairs
+
+        for i in out_idx:
+            violations.append(_violation("border", f"Panel out of border: {rects[i]}", panel=i))
+        for i in bad_idx:
+            violations.append(_violation("degenerate", f"Degenerate panel: {rects[i]}", panel=i))
+        for i, k in hits:
+            if getattr(obstacles[k], "shape", "rect") != "rect" and not obstacle_hits(obstacles[k], rects[i]):
+                continue   # inside the bounding box only
+            violations.append(_violation(
+                "obstacle", f"Collision with obstacle at {masks[k]} by {rects[i]}", panel=i, obstacle=k))
+
+        # sweep along the longer axis: fewer panels share a window there
+        gaps = (gx, gy) if panel is not None else (None, None)
+        if L >= W:
+            cols, ga, gb = (xs, xe, ys, ye), gaps[0], gaps[1]
+        else:
+            cols, ga, gb = (ys, ye, xs, xe), gaps[1], gaps[0]
+        for i, j, check in sorted(pairs_fn(*cols, ga, gb, tol)):
+            if check == "overlap":
+                msg = f"Panels overlap: {rects[i]} and {rects[j]}"
+            else:
+                msg = f"Panels closer than gap ({gx}, {gy}): {rects[i]} and {rects[j]}"
+            violations.append(_violation(check, msg, panel=i, other=j))
+
+    counts = {}
+    for v in violations:
+        counts[v["check"]] = counts.get(v["check"], 0) + 1
+    return {"ok": not violations, "panels": n, "counts": counts, "violations": violations}
+
+def assert_layout_valid(roof, border, data, obstacles: List[Obstacle]) -> None:
+    """Raise AssertionError on the first border/obstacle/overlap violation (see validate_layout)."""
+    report = validate_layout(roof, border, data, obstacles)
+    if not report["ok"]:
+        raise AssertionError(report["violations"][0]["message"])
 
 # ---------- CSV export ----------
 # Now the annotation 'panel: Panel' works correctly
 def export_csv(path: str, side: str, data, panel: Panel):
-    
-    # ! FIX: This import is no longer needed (removed)
-    # from panel import Panel 
-    
-    # ensure directory exists
-    if os.path.dirname(path):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        
-    rects = data.get("placed_rects", [])
-    sx, sy = data["start_x"], data["start_y"]
-    w, h = data["panel_w"], data["panel_h"]
-    gx, gy = panel.gap_x, panel.gap_y
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        wr = csv.writer(f)
-        wr.writerow(["side", "x_mm", "y_mm", "w_mm", "h_mm", "row", "col"])
-        for (x, y, pw, ph) in rects:
-            r = round((y - sy) / (h + gy)) if (h + gy) > 0 else 0
-            c = round((x - sx) / (w + gx)) if (w + gx) > 0 else 0
-            wr.writerow([side, int(round(x)), int(round(y)), int(round(pw)), int(round(ph)), r, c])
+    """
+    Write one layout as side,x_mm,y_mm,w_mm,h_mm,row,col
+    (see export.py for batched CSV/JSONL/NPZ export of many roofs).
+    """
+    write_csv(path, side, data, panel)
@@ -0,0 +1,6 @@
+# The modules import each other by plain name (from panel import Panel),
+# so put solar_optimization/ on the path, as running them as scripts does.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
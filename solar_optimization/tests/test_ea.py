@@ -0,0 +1,23 @@
+# GA layouts (visualization_ea) keep the border, obstacle and gap rules.
+import pytest
+
+from config import Config
+from roof import Roof
+from panel import Panel
+from project_utils import Obstacle, validate_layout
+from visualization_ea import _run_ga_for_side
+
+
+@pytest.mark.parametrize("side", ["L", "R"])
+@pytest.mark.parametrize("slot_step", [None, 400.0])
+def test_ga_layout_keeps_panel_gaps(side, slot_step):
+    cfg = Config()
+    roof_cfg = cfg.roof_left if side == "L" else cfg.roof_right
+    roof = Roof(width=roof_cfg.width, length=roof_cfg.length)
+    panel = Panel(cfg.panel.width, cfg.panel.height, gap_x=cfg.panel.gap_x,
+                  gap_y=cfg.panel.gap_y, clamp_margin=cfg.panel.clamp)
+    obstacles = [Obstacle(**vars(o)) for o in (cfg.obstacles_left if side == "L" else cfg.obstacles_right)]
+    data = _run_ga_for_side(side, roof, panel, roof_cfg.border, obstacles,
+                            seed=1, slot_step=slot_step, verbose=False)
+    report = validate_layout(roof, roof_cfg.border, data, obstacles, panel)
+    assert report["ok"], report["counts"]
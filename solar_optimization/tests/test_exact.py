@@ -0,0 +1,68 @@
+# Exact branch-and-bound packing (visualization_exact) against brute force.
+import itertools
+import random
+
+import pytest
+
+from config import Config
+from roof import Roof
+from panel import Panel
+from project_utils import Obstacle, validate_layout
+from visualization_exact import _max_independent_set, _solve_exact_for_side
+
+
+def random_conflicts(n, p, rng):
+    """Random conflict graph as bitsets, bit i set in row i."""
+    rows = [1 << i for i in range(n)]
+    for i, j in itertools.combinations(range(n), 2):
+        if rng.random() < p:
+            rows[i] |= 1 << j
+            rows[j] |= 1 << i
+    return rows
+
+
+def brute_force_mis(conflicts):
+    n = len(conflicts)
+    for k in range(n, 0, -1):
+        for subset in itertools.combinations(range(n), k):
+            if all(not (conflicts[i] >> j) & 1 for i, j in itertools.combinations(subset, 2)):
+                return k
+    return 0
+
+
+def independent(indices, conflicts):
+    return all(not (conflicts[i] >> j) & 1 for i, j in itertools.combinations(indices, 2))
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    conflicts = random_conflicts(rng.randint(1, 13), rng.choice([0.1, 0.3, 0.5, 0.8]), rng)
+    best, upper, nodes, optimal = _max_independent_set(conflicts, incumbent=[])
+    assert optimal
+    assert len(best) == upper == brute_force_mis(conflicts)
+    assert independent(best, conflicts)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_node_limit_gives_valid_bound(seed):
+    rng = random.Random(1000 + seed)
+    conflicts = random_conflicts(14, 0.3, rng)
+    exact = brute_force_mis(conflicts)
+    best, upper, nodes, optimal = _max_independent_set(conflicts, incumbent=[], node_limit=2)
+    assert independent(best, conflicts)
+    assert len(best) <= exact <= upper
+    assert optimal == (len(best) == upper)
+
+
+def test_default_roof_is_solved_to_optimality():
+    cfg = Config()
+    border = cfg.roof_left.border
+    roof = Roof(width=cfg.roof_left.width, length=cfg.roof_left.length)
+    panel = Panel(cfg.panel.width, cfg.panel.height, gap_x=cfg.panel.gap_x,
+                  gap_y=cfg.panel.gap_y, clamp_margin=cfg.panel.clamp)
+    obstacles = [Obstacle(**vars(o)) for o in cfg.obstacles_left]
+    data = _solve_exact_for_side("L", roof, panel, border, obstacles, time_limit=60)
+    assert data["optimal"]
+    assert data["total_panels"] == data["upper_bound"]
+    assert validate_layout(roof, border, data, obstacles, panel)["ok"]
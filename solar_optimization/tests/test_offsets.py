@@ -0,0 +1,67 @@
+# best_grid_offset (panel) against an exhaustive offset sweep.
+import random
+
+import pytest
+
+import panel as panel_mod
+from roof import Roof
+from panel import Panel, best_grid_offset, fill_roof_with_panels, fill_with_obstacles
+from project_utils import Obstacle
+
+STEP = 5   # every coordinate below is a multiple of STEP, and so is every breakpoint
+
+
+def random_case(seed):
+    """Small roof with a few obstacles, all on the STEP raster."""
+    rng = random.Random(seed)
+    roof = Roof(width=rng.randrange(600, 1000, STEP), length=rng.randrange(900, 1500, STEP))
+    panel = Panel(rng.choice([100, 120]), rng.choice([170, 190]), gap_x=10, gap_y=15)
+    border = rng.choice([0, 20, 35])
+    obstacles = [Obstacle("L", rng.randrange(0, roof.length - 100, STEP),
+                          rng.randrange(0, roof.width - 100, STEP),
+                          rng.randrange(20, 200, STEP), rng.randrange(20, 200, STEP),
+                          clearance=rng.choice([0, 10, 25]))
+                 for _ in range(rng.randint(1, 4))]
+    return roof, panel, border, obstacles
+
+
+def sweep(roof, panel, border, obstacles):
+    """Most cells kept over every offset on the STEP raster."""
+    base = fill_roof_with_panels(roof, panel, border, border, "portrait")
+    pitch_x = base["panel_w"] + panel.gap_x
+    pitch_y = base["panel_h"] + panel.gap_y
+    best = 0
+    for oy in range(0, pitch_y, STEP):
+        for ox in range(0, pitch_x, STEP):
+            data = fill_roof_with_panels(roof, panel, border, border, "portrait", "left", "top", ox, oy)
+            best = max(best, fill_with_obstacles(roof, panel, data, obstacles)["total_panels"])
+    return best
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_matches_exhaustive_sweep(seed):
+    roof, panel, border, obstacles = random_case(seed)
+    out = best_grid_offset(roof, panel, border, border, "portrait", obstacles)
+    assert out["total_panels"] == sweep(roof, panel, border, obstacles)
+    assert out["total_panels"] == len(out["placed_rects"])
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_never_worse_than_centred_grid(seed):
+    roof, panel, border, obstacles = random_case(seed)
+    centred = fill_with_obstacles(roof, panel, fill_roof_with_panels(roof, panel, border, border, "portrait"),
+                                  obstacles)
+    out = best_grid_offset(roof, panel, border, border, "portrait", obstacles)
+    assert out["total_panels"] >= centred["total_panels"]
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_pure_python_path_agrees(seed, monkeypatch):
+    if panel_mod.np is None:
+        pytest.skip("NumPy not installed")
+    roof, panel, border, obstacles = random_case(seed)
+    with_np = best_grid_offset(roof, panel, border, border, "portrait", obstacles)
+    monkeypatch.setattr(panel_mod, "np", None)
+    pure = best_grid_offset(roof, panel, border, border, "portrait", obstacles)
+    assert pure["total_panels"] == with_np["total_panels"]
+    assert pure["breakpoints"] == with_np["breakpoints"]
@@ -0,0 +1,86 @@
+# validate_layout (project_utils) against an O(n^2) brute-force check.
+import itertools
+import random
+
+import pytest
+
+import geometry
+import project_utils
+from roof import Roof
+from panel import Panel
+from layout import Layout
+from project_utils import Obstacle, validate_layout
+
+BORDER = 300
+
+
+def brute_force(roof, rects, obstacles, gx, gy):
+    """Set of (check, i, j_or_k) a correct validator must report."""
+    L, W = roof.length, roof.width
+    found = set()
+    for i, (x, y, w, h) in enumerate(rects):
+        if not (x >= BORDER and y >= BORDER and x + w <= L - BORDER and y + h <= W - BORDER):
+            found.add(("border", i, None))
+        if w <= 0 or h <= 0:
+            found.add(("degenerate", i, None))
+        for k, ob in enumerate(obstacles):
+            if geometry.overlap(x, y, w, h, *ob.inflated()):
+                found.add(("obstacle", i, k))
+    for (i, a), (j, b) in itertools.combinations(enumerate(rects), 2):
+        sep_x = max(b[0] - (a[0] + a[2]), a[0] - (b[0] + b[2]))
+        sep_y = max(b[1] - (a[1] + a[3]), a[1] - (b[1] + b[3]))
+        if sep_x < 0 and sep_y < 0:
+            found.add(("overlap", i, j))
+        elif sep_x < gx and sep_y < gy:
+            found.add(("gap", i, j))
+    return found
+
+
+def reported(report):
+    return {(v["check"], v["panel"], v.get("other", v.get("obstacle"))) for v in report["violations"]}
+
+
+def random_case(seed):
+    """Small roof with panels on a 50 mm raster, so no check depends on tolerances."""
+    rng = random.Random(seed)
+    L, W = rng.choice([(6000, 3000), (3000, 6000), (5000, 5000)])
+    rects = [(rng.randrange(0, L - 1000, 50), rng.randrange(0, W - 1000, 50),
+              rng.choice([1000, 1700]), rng.choice([1000, 1700])) for _ in range(rng.randint(0, 14))]
+    obstacles = [Obstacle("L", rng.randrange(0, L, 50), rng.randrange(0, W, 50), 400, 400,
+                          clearance=rng.choice([0, 100])) for _ in range(rng.randint(0, 2))]
+    return Roof(width=W, length=L), rects, obstacles
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "pure":
+        monkeypatch.setattr(project_utils, "np", None)
+        monkeypatch.setattr(geometry, "np", None)
+    elif project_utils.np is None:
+        pytest.skip("NumPy not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_matches_brute_force(seed, backend):
+    roof, rects, obstacles = random_case(seed)
+    panel = Panel(1000, 1700, gap_x=100, gap_y=150)
+    report = validate_layout(roof, BORDER, {"placed_rects": rects}, obstacles, panel)
+    expected = brute_force(roof, rects, obstacles, 100, 150)
+    assert reported(report) == expected
+    assert report["ok"] == (not expected)
+    assert sum(report["counts"].values()) == len(expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_without_panel_only_overlaps_are_checked(seed, backend):
+    roof, rects, obstacles = random_case(seed)
+    report = validate_layout(roof, BORDER, {"placed_rects": Layout.of(rects)}, obstacles)
+    expected = {v for v in brute_force(roof, rects, obstacles, 0, 0) if v[0] != "gap"}
+    assert reported(report) == expected
+
+
+def test_touching_panels_are_valid(backend):
+    roof = Roof(width=3000, length=6000)
+    rects = [(300, 300, 1000, 1700), (1300, 300, 1000, 1700), (300, 2000, 1000, 700)]
+    assert validate_layout(roof, BORDER, {"placed_rects": rects}, [])["ok"]
@@ -1,13 +1,14 @@
 # visualization.py
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from config import Config
 from roof import Roof
 from panel import Panel, best_orientation, fill_roof_with_panels, fill_with_obstacles, augment_with_gap_portraits
 
-# Import our new, modularized plot functions
-from plotter_top_view import draw_two_roofs_columns
-from project_utils import Obstacle, assert_layout_valid, export_csv, _overlap  # _overlap added for logging
+# Plotting (matplotlib) is imported lazily in run_top_view_calculation,
+# so the layout functions here can run headless.
+from project_utils import Obstacle, assert_layout_valid, export_csv
 
 # ---------- CALCULATION AND COMPARISON FUNCTION ----------
 def calculate_best_layout(roof, panel_base, BORDER, obstacles, orientation_hint):
@@ -33,8 +34,21 @@ def calculate_best_layout(roof, panel_base, BORDER, obstacles, orientation_hint)
     
     return final_data
 
+def run_layout_jobs(jobs, concurrent=False):
+    """
+    Run calculate_best_layout for every job {key: (roof, panel, BORDER, obstacles, orientation)}.
+    The jobs share no state, so with concurrent=True each one runs in its own
+    worker process and the total time approaches that of the slowest job.
+    Returns {key: layout}.
+    """
+    if not concurrent:
+        return {key: calculate_best_layout(*args) for key, args in jobs.items()}
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {key: pool.submit(calculate_best_layout, *args) for key, args in jobs.items()}
+        return {key: fut.result() for key, fut in futures.items()}
+
 # ---------- MAIN TOP VIEW CALCULATION ----------
-def run_top_view_calculation():
+def run_top_view_calculation(concurrent=False):
     print("--- [START] Running 'Top View' calculation ---")
     cfg = Config()  
 
@@ -49,27 +63,31 @@ def run_top_view_calculation():
     obstacles_left = [Obstacle(**vars(o)) for o in cfg.obstacles_left]
     obstacles_right = [Obstacle(**vars(o)) for o in cfg.obstacles_right]
 
-    # 2. Generate and compare layouts for LEFT roof
-    
-    # Attempt 1: Portrait orientation as base
-    data_L_P = calculate_best_layout(roof_left, panel_base, BORDER, obstacles_left, "portrait")
-    # Attempt 2: Landscape orientation as base
-    data_L_L = calculate_best_layout(roof_left, panel_base, BORDER, obstacles_left, "landscape")
-    
+    # 2. Compute all four independent layouts (L/R x portrait/landscape)
+    layouts = run_layout_jobs({
+        ("L", "portrait"):  (roof_left,  panel_base, BORDER, obstacles_left,  "portrait"),
+        ("L", "landscape"): (roof_left,  panel_base, BORDER, obstacles_left,  "landscape"),
+        ("R", "portrait"):  (roof_right, panel_base, BORDER, obstacles_right, "portrait"),
+        ("R", "landscape"): (roof_right, panel_base, BORDER, obstacles_right, "landscape"),
+    }, concurrent=concurrent)
+
+    # 3. Compare layouts for LEFT roof
+    data_L_P = layouts[("L", "portrait")]
+    data_L_L = layouts[("L", "landscape")]
+
     data_L = data_L_P if data_L_P["total_panels"] >= data_L_L["total_panels"] else data_L_L
     print(f"[LEFT ROOF] Best Layout: {data_L['total_panels']} panels. (P={data_L_P['total_panels']}, L={data_L_L['total_panels']})")
 
-    # 3. Generate and compare layouts for RIGHT roof
-
-    data_R_P = calculate_best_layout(roof_right, panel_base, BORDER, obstacles_right, "portrait")
-    data_R_L = calculate_best_layout(roof_right, panel_base, BORDER, obstacles_right, "landscape")
+    # 4. Compare layouts for RIGHT roof
+    data_R_P = layouts[("R", "portrait")]
+    data_R_L = layouts[("R", "landscape")]
     
     data_R = data_R_P if data_R_P["total_panels"] >= data_R_L["total_panels"] else data_R_L
     print(f"[RIGHT ROOF] Best Layout: {data_R['total_panels']} panels. (P={data_R_P['total_panels']}, L={data_R_L['total_panels']})")
     
     print(f"[TOTAL] Panels placed: {data_L['total_panels'] + data_R['total_panels']}")
 
-    # 4. Validation
+    # 5. Validation
     try:
         assert_layout_valid(roof_left,  BORDER, data_L, obstacles_left)
         assert_layout_valid(roof_right, BORDER, data_R, obstacles_right)
@@ -79,13 +97,15 @@ def run_top_view_calculation():
         # Stop if validation fails
         return
 
-    # 5. Visualization and export
+    # 6. Visualization and export
     png_path = os.path.join(cfg.out_dir, "top_view.png") if cfg.save_png else None
     
     # Use panel parameters from the selected best result
     panel_for_plot = Panel(width=data_L["panel_w"], height=data_L["panel_h"],
                            gap_x=panel_base.gap_x, gap_y=panel_base.gap_y, clamp_margin=panel_base.clamp_margin)
     
+    from plotter_top_view import draw_two_roofs_columns  # lazy: matplotlib
+    
     draw_two_roofs_columns(roof_left, roof_right, panel_for_plot, data_L, data_R,
                            obstacles_left=obstacles_left, obstacles_right=obstacles_right,
                            save_path=png_path, show=True)
@@ -103,4 +123,4 @@ def run_top_view_calculation():
 
 
 if __name__ == "__main__":
-    run_top_view_calculation()
+    run_top_view_calculation(concurrent="--concurrent" in sys.argv)
@@ -6,21 +6,40 @@ Run:  python visualization_ea.py
 Algorithm:
 - generates a set of potential "slots" for portrait and landscape orientations;
 - each individual = a permutation of slots;
-- greedy decoder iterates over the slots and places panels,
-  if they do not exceed the border and do not collide with obstacles / other panels;
+- slots are generated inside the border and clear of obstacles;
+  slot-vs-slot conflicts (overlap, or closer than the panel gaps) are precomputed
+  once per side as a conflict graph (bitsets);
+- greedy decoder iterates over the slots and places a panel
+  unless an already placed one conflicts with it;
 - objective function: maximize number of panels.
 """
 
+import hashlib
 import os
+import pickle
 import random
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: the population falls back to array('i') rows
+    np = None
 
 from config import Config
 from roof import Roof
-from panel import Panel, fill_roof_with_panels
-from plotter_top_view import draw_two_roofs_columns
-from project_utils import Obstacle, assert_layout_valid, export_csv, _overlap
+from panel import (Panel, fill_roof_with_panels, lattice_cells, LATTICE_CACHE_SIZE,
+                   register_lattice_cache)
+from layout import Layout
+from project_utils import Obstacle, assert_layout_valid, export_csv
+from geometry import clip, overlaps_any
+from occupancy import OccupancyGrid
 
 
 # ---------- BASIC STRUCTURES ----------
@@ -37,6 +56,14 @@ class Slot:
 
 # ---------- SLOT GENERATION ----------
 
+@register_lattice_cache
+@lru_cache(maxsize=LATTICE_CACHE_SIZE)
+def _slot_template(side: str, orient: str, L, W, border, gx, gy, w, h) -> Tuple[Slot, ...]:
+    """All lattice slots of one orientation before obstacle filtering (Slot is frozen, so shareable)."""
+    return tuple(Slot(side=side, x=x, y=y, w=w, h=h, orient=orient)
+                 for (x, y, _, _) in lattice_cells(L, W, border, border, gx, gy, w, h))
+
+
 def _generate_slots_for_side(
     side: str,
     roof: Roof,
@@ -64,23 +91,11 @@ def _generate_slots_for_side(
             return
 
         w, h = data["panel_w"], data["panel_h"]
-        sx, sy = data["start_x"], data["start_y"]
-
-        for r in range(ny):
-            y = sy + r * (h + gy)
-            for c in range(nx):
-                x = sx + c * (w + gx)
-
-                # check obstacles
-                bad = False
-                for (mx, my, mw, mh) in inflated:
-                    if _overlap(x, y, w, h, mx, my, mw, mh):
-                        bad = True
-                        break
-                if bad:
-                    continue
-
-                slots.append(Slot(side=side, x=x, y=y, w=w, h=h, orient=orient_name))
+        # memoized slot template, shared by roofs/sides of the same size
+        template = _slot_template(side, orient_name, roof.length, roof.width, border, gx, gy, w, h)
+        # check obstacles: all cells against all inflated obstacles in one batch
+        blocked = overlaps_any([(s.x, s.y, s.w, s.h) for s in template], inflated)
+        slots.extend(s for s, bad in zip(template, blocked) if not bad)
 
     # portrait + landscape
     scan_orientation("P", "portrait")
@@ -92,51 +107,285 @@ def _generate_slots_for_side(
     return slots
 
 
-# ---------- DECODER AND FITNESS ----------
+DENSE_RESOLUTION = 10.0   # mm per occupancy cell for dense slot generation
+DENSE_STEP = 200.0        # mm between dense slot corners (see _generate_dense_slots_for_side)
+
 
-def _decode_individual(
-    slots_order: List[Slot],
+def _step_positions(lo: float, hi: float, step: float) -> List[float]:
+    """lo, lo+step, ... up to hi, plus hi itself so panels can reach the far border."""
+    if hi < lo:
+        return []
+    n = int((hi - lo) // step + 1e-9)
+    out = [lo + k*step for k in range(n + 1)]
+    if hi - out[-1] > 1e-9:
+        out.append(hi)
+    return out
+
+
+def _generate_dense_slots_for_side(
+    side: str,
     roof: Roof,
+    panel: Panel,
     border: int,
     obstacles: List[Obstacle],
-    panel: Panel,
-) -> dict:
+    step: float = DENSE_STEP,
+    resolution: float = DENSE_RESOLUTION,
+) -> List[Slot]:
     """
-    Greedy decoder: iterate over slots in given order,
-    placing panels without collisions.
+    Every feasible slot (portrait + landscape) with its corner on a step-mm
+    lattice anchored at the border, checked against an occupancy raster of the
+    obstacles in one summed-area-table lookup per orientation. Returned in x
+    order. Slot count grows with 1/step**2 and the conflict bitsets with its
+    square, so keep step coarse (DENSE_STEP) on big roofs.
     """
-    placed: List[Tuple[float, float, float, float]] = []
-    inflated_obs = [ob.inflated() for ob in obstacles]
+    if step <= 0:
+        raise ValueError(f"step must be > 0, got {step!r}")
+    # only obstacles go into the raster: the candidate positions below already
+    # keep the border exactly, while a border off the raster would block its
+    # partly covered edge cells and reject every slot touching the far border
+    grid = OccupancyGrid.from_roof(roof, 0, 0, obstacles, resolution)
+    sizes = [("P", panel.width, panel.height)]
+    if panel.width != panel.height:
+        sizes.append(("L", panel.height, panel.width))
+    slots: List[Slot] = []
+    for orient, w, h in sizes:
+        xs = _step_positions(border, roof.length - border - w, step)
+        ys = _step_positions(border, roof.width - border - h, step)
+        if not xs or not ys:
+            continue
+        if np is not None:
+            gx_, gy_ = np.meshgrid(np.array(xs), np.array(ys))
+            cand = np.column_stack([gx_.ravel(), gy_.ravel(),
+                                    np.full(gx_.size, float(w)), np.full(gx_.size, float(h))])
+            free = grid.free_many(cand)
+            fx, fy = cand[free, 0].tolist(), cand[free, 1].tolist()
+        else:
+            cand = [(x, y, w, h) for y in ys for x in xs]
+            free = grid.free_many(cand)
+            fx = [c[0] for c, ok in zip(cand, free) if ok]
+            fy = [c[1] for c, ok in zip(cand, free) if ok]
+        slots.extend(Slot(side=side, x=x, y=y, w=w, h=h, orient=orient) for x, y in zip(fx, fy))
 
-    L, W = roof.length, roof.width
-    bx = by = border
+    if not slots:
+        raise RuntimeError(f"[{side}] No valid slot found. Check border/obstacles.")
 
-    for s in slots_order:
-        x, y, w, h = s.x, s.y, s.w, s.h
+    slots.sort(key=lambda s: s.x)
+    return slots
 
-        # check border
-        if not (x >= bx and y >= by and x + w <= L - bx and y + h <= W - by):
-            continue
 
-        # collision with already placed panels
-        collision = False
-        for (px, py, pw, ph) in placed:
-            if _overlap(x, y, w, h, px, py, pw, ph):
-                collision = True
-                break
-        if collision:
-            continue
+def _slots_and_conflicts(side: str, roof: Roof, panel: Panel, border: int,
+                         obstacles: List[Obstacle], slot_step: Optional[float] = None):
+    """
+    Candidate slots and their conflict graph for one side: the two centred
+    lattices (slot_step=None) or the dense step lattice.
+    """
+    if slot_step is None:
+        slots = _generate_slots_for_side(side, roof, panel, border, obstacles)
+    else:
+        slots = _generate_dense_slots_for_side(side, roof, panel, border, obstacles, slot_step)
+    return slots, _build_conflict_graph(slots, roof, panel)
 
-        # collision with obstacles (including clearance)
-        for (mx, my, mw, mh) in inflated_obs:
-            if _overlap(x, y, w, h, mx, my, mw, mh):
-                collision = True
-                break
-        if collision:
+
+# ---------- SPATIAL INDEX ----------
+
+class _SpatialHash:
+    """
+    Uniform-grid bucket index over rectangles (x, y, w, h) on a roof of size
+    length x width, used to build the conflict graph when NumPy is missing.
+    Cell size follows the panel lattice pitch, so a slot only lands in a
+    handful of buckets and a query only sees its neighbours.
+    """
+
+    def __init__(self, length: float, width: float, cell_w: float, cell_h: float):
+        self.cell_w = float(cell_w)
+        self.cell_h = float(cell_h)
+        self.nx = max(1, int(length // self.cell_w) + 1)
+        self.ny = max(1, int(width // self.cell_h) + 1)
+        self.buckets: List[list] = [[] for _ in range(self.nx * self.ny)]
+
+    def _span(self, x: float, y: float, w: float, h: float):
+        # clamping keeps out-of-roof rectangles (e.g. obstacle clearance) in edge buckets
+        cw, ch, nx, ny = self.cell_w, self.cell_h, self.nx - 1, self.ny - 1
+        i0 = min(max(int(x // cw), 0), nx)
+        i1 = min(max(int((x + w) // cw), 0), nx)
+        j0 = min(max(int(y // ch), 0), ny)
+        j1 = min(max(int((y + h) // ch), 0), ny)
+        return i0, i1, j0, j1
+
+    def insert(self, rect: Tuple[float, float, float, float], key=None) -> None:
+        """Store rect; key (e.g. a slot index) is returned by overlapping()."""
+        i0, i1, j0, j1 = self._span(*rect)
+        buckets, ny = self.buckets, self.ny
+        item = (*rect, key)
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                buckets[i * ny + j].append(item)
+
+    def overlapping(self, x: float, y: float, w: float, h: float) -> set:
+        """Return keys of all stored rectangles overlapping (x, y, w, h)."""
+        i0, i1, j0, j1 = self._span(x, y, w, h)
+        buckets, ny = self.buckets, self.ny
+        xe, ye = x + w, y + h
+        keys = set()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                for (px, py, pw, ph, key) in buckets[i * ny + j]:
+                    if not (xe <= px or px + pw <= x or ye <= py or py + ph <= y):
+                        keys.add(key)
+        return keys
+
+
+# ---------- SLOT CONFLICT GRAPH ----------
+
+_GAP_TOL = 1e-6   # mm, same tolerance as validate_layout
+
+
+def _conflict_rows_np(slots: List[Slot], gx: float, gy: float) -> List[int]:
+    """
+    NumPy path of _build_conflict_graph: slots sorted by x, each one tested
+    against the x-window of possible partners at once, and only the index
+    span of its hits packed into a Python-int bitset (cheap when the slots
+    come in x order, as dense slots do).
+    """
+    n = len(slots)
+    x = np.array([s.x for s in slots]); y = np.array([s.y for s in slots])
+    w = np.array([s.w for s in slots]); h = np.array([s.h for s in slots])
+    order = np.argsort(x, kind="stable")
+    xs = x[order]
+    lo = np.searchsorted(xs, x - gx - w.max(), side="right")
+    hi = np.searchsorted(xs, x + w + gx, side="left")
+    row = np.zeros(n, dtype=bool)
+    conflicts: List[int] = []
+    for i in range(n):
+        cand = order[lo[i]:hi[i]]
+        hit = cand[(x[i] - gx < x[cand] + w[cand]) &
+                   (y[cand] < y[i] + h[i] + gy) & (y[i] - gy < y[cand] + h[cand])]
+        row[hit] = True
+        row[i] = True
+        a = min(i, int(hit.min())) & ~7 if len(hit) else i & ~7   # byte-aligned span
+        b = max(i, int(hit.max())) + 1 if len(hit) else i + 1
+        bits = int.from_bytes(np.packbits(row[a:b], bitorder="little").tobytes(), "little")
+        conflicts.append(bits << a)
+        row[hit] = False
+        row[i] = False
+    return conflicts
+
+
+def _build_conflict_graph(slots: List[Slot], roof: Roof, panel: Panel) -> List[int]:
+    """
+    Pairwise slot conflicts, computed once per roof side.
+    conflicts[i] is a bitset (Python int) with bit j set when slots i and j
+    overlap or are closer than gap_x and gap_y (as validate_layout checks);
+    bit i itself is always set, so placing i also blocks it.
+    """
+    # slots exactly one gap apart must stay compatible despite float noise
+    gx, gy = panel.gap_x - _GAP_TOL, panel.gap_y - _GAP_TOL
+    if np is not None and slots:
+        return _conflict_rows_np(slots, gx, gy)
+    pitch = max(panel.width, panel.height)
+    index = _SpatialHash(roof.length, roof.width, pitch + panel.gap_x, pitch + panel.gap_y)
+    for i, s in enumerate(slots):
+        index.insert((s.x, s.y, s.w, s.h), i)
+    conflicts: List[int] = []
+    for i, s in enumerate(slots):
+        bits = 1 << i
+        for j in index.overlapping(s.x - gx, s.y - gy, s.w + 2*gx, s.h + 2*gy):
+            bits |= 1 << j
+        conflicts.append(bits)
+    return conflicts
+
+
+# ---------- UPPER BOUNDS ----------
+
+def _union_area(rects: List[Tuple[float, float, float, float]]) -> float:
+    """Exact area of a union of rectangles (coordinate compression, fine for dozens)."""
+    if not rects:
+        return 0.0
+    xs = sorted({v for (x, _, w, _) in rects for v in (x, x + w)})
+    area = 0.0
+    for x0, x1 in zip(xs, xs[1:]):
+        spans = sorted((y, y + h) for (x, y, w, h) in rects if x <= x0 and x + w >= x1)
+        covered, cur = 0.0, None
+        for a, b in spans:
+            if cur is None or a > cur[1]:
+                if cur is not None:
+                    covered += cur[1] - cur[0]
+                cur = [a, b]
+            else:
+                cur[1] = max(cur[1], b)
+        if cur is not None:
+            covered += cur[1] - cur[0]
+        area += (x1 - x0) * covered
+    return area
+
+
+def _clique_cover_bound(conflicts: List[int], cand: Optional[int] = None) -> int:
+    """
+    Greedy partition of the conflict graph (or of the subgraph induced by
+    the cand bitmask) into cliques. At most one slot per clique can be
+    placed, so the clique count bounds the number of panels any decode can reach.
+    """
+    uncovered = (1 << len(conflicts)) - 1 if cand is None else cand
+    n_cliques = 0
+    while uncovered:
+        cand = conflicts[(uncovered & -uncovered).bit_length() - 1] & uncovered
+        clique = 0
+        while cand:
+            u = (cand & -cand).bit_length() - 1
+            clique |= 1 << u
+            cand &= conflicts[u] & ~(1 << u)
+        uncovered &= ~clique
+        n_cliques += 1
+    return n_cliques
+
+
+def _upper_bound(
+    slots: List[Slot],
+    conflicts: List[int],
+    roof: Roof,
+    panel: Panel,
+    border: int,
+    obstacles: List[Obstacle],
+) -> int:
+    """
+    Provable cap on the panel count for this slot set: the smallest of
+    the slot count, the clique-cover bound and the free-area bound
+    (usable area minus inflated obstacles, over one panel area).
+    """
+    L_eff, W_eff = roof.length - 2 * border, roof.width - 2 * border
+    if L_eff <= 0 or W_eff <= 0:
+        return 0
+    usable = (border, border, L_eff, W_eff)
+    # circle/polygon obstacles are skipped: their bounding box would overstate the blocked area
+    clipped = [c for c in (clip(ob.inflated(), usable) for ob in obstacles
+                           if getattr(ob, "shape", "rect") == "rect") if c is not None]
+    free_area = L_eff * W_eff - _union_area(clipped)
+    area_bound = int(free_area // (panel.width * panel.height))
+    return min(len(slots), _clique_cover_bound(conflicts), area_bound)
+
+
+# ---------- DECODER AND FITNESS ----------
+
+def _decode_indices(order: List[int], conflicts: List[int]) -> List[int]:
+    """
+    Greedy decoder over slot indices, in the given order: a slot is placed
+    unless its bit is set in the blocked mask, then its conflict row (its own
+    bit and every slot overlapping it or within the gaps) is OR-ed into the
+    mask. Slots are already inside the border and clear of obstacles when
+    generated, so the result is a valid layout; returns the placed slot indices.
+    """
+    blocked = 0
+    placed: List[int] = []
+    for i in order:
+        if (blocked >> i) & 1:
             continue
+        placed.append(i)
+        blocked |= conflicts[i]
+    return placed
 
-        placed.append((x, y, w, h))
 
+def _layout_data(placed: List[Tuple[float, float, float, float]], panel: Panel, border: int) -> dict:
+    """Wrap placed rectangles (as a Layout) into the layout dict used by plotting/export."""
     # For top-view it's enough to pass placed_rects;
     # cols/rows are not used here.
     data = {
@@ -148,7 +397,7 @@ def _decode_individual(
         "rows": 0,
         "start_x": border,
         "start_y": border,
-        "placed_rects": placed,
+        "placed_rects": Layout.of(placed),
         "total_panels": len(placed),
     }
     return data
@@ -159,46 +408,381 @@ def _fitness(data: dict) -> int:
     return int(data.get("total_panels", 0))
 
 
-# ---------- GA OPERATORS ----------
+# ---------- POPULATION ----------
+# A population is a (pop_size, n_slots) int32 matrix of slot indices:
+# a NumPy array when available, otherwise a list of array('i') rows.
+# Either way a gene costs 4 bytes and rows support len/slicing/tobytes/tolist.
 
-def _order_crossover(parent1: List[Slot], parent2: List[Slot]) -> List[Slot]:
-    """Order Crossover (OX) for permutations."""
-    n = len(parent1)
-    if n < 2:
-        return parent1[:]
-    a, b = sorted(random.sample(range(n), 2))
-    child: List[Slot] = [None] * n  # type: ignore
+def _empty_population(pop_size: int, n_slots: int):
+    if np is not None:
+        return np.empty((pop_size, n_slots), dtype=np.int32)
+    return [array("i", bytes(4 * n_slots)) for _ in range(pop_size)]
 
-    # segment from first parent
-    child[a:b] = parent1[a:b]
-    used = {s for s in child[a:b] if s is not None}
 
-    # remaining slots in order from second parent
-    j = b
-    for s in parent2:
-        if s in used:
-            continue
-        if j >= n:
-            j = 0
-        child[j] = s
-        j += 1
+def _random_population(pop_size: int, n_slots: int, rng=random):
+    """pop_size random permutations of range(n_slots)."""
+    population = _empty_population(pop_size, n_slots)
+    for k in range(pop_size):
+        population[k] = array("i", rng.sample(range(n_slots), n_slots))
+    return population
 
-    # type: ignore, but in fact all slots filled
-    return child  # type: ignore
 
+# ---------- GA OPERATORS ----------
 
-def _mutate_swap(ind: List[Slot], p_mut: float) -> None:
+def _order_crossover(parent1, parent2, rng=random):
+    """Order Crossover (OX) for int32 rows of slot indices."""
+    n = len(parent1)
+    if n < 2:
+        return parent1[:]
+    a, b = sorted(rng.sample(range(n), 2))
+
+    # segment from first parent, remaining slots in order from second parent,
+    # written from position b onwards and wrapping around to the start
+    segment = parent1[a:b]
+    if np is not None and isinstance(parent1, np.ndarray):
+        used = np.zeros(n, dtype=bool)
+        used[segment] = True
+        rest = parent2[~used[parent2]]
+        child = np.empty_like(parent1)
+        child[a:b] = segment
+        child[b:] = rest[:n - b]
+        child[:a] = rest[n - b:]
+        return child
+
+    used = set(segment)
+    rest = array("i", [s for s in parent2 if s not in used])
+    return rest[n - b:] + segment + rest[:n - b]
+
+
+def _mutate_swap(ind, p_mut: float, rng=random) -> None:
     """Simple mutation: swap two positions."""
     if len(ind) < 2:
         return
-    if random.random() > p_mut:
+    if rng.random() > p_mut:
         return
-    i, j = random.sample(range(len(ind)), 2)
+    i, j = rng.sample(range(len(ind)), 2)
     ind[i], ind[j] = ind[j], ind[i]
 
 
+# ---------- PARALLEL FITNESS ----------
+
+# Conflict graph of the current side, installed once per worker process.
+_worker_conflicts: List[int] = []
+
+
+def _init_worker(conflicts: List[int]) -> None:
+    global _worker_conflicts
+    _worker_conflicts = conflicts
+
+
+def _score_packed(packed: bytes) -> List[int]:
+    """Worker task: decode a chunk of permutations packed as int32 bytes."""
+    genes = array("i")
+    genes.frombytes(packed)
+    n = len(_worker_conflicts)
+    return [len(_decode_indices(genes[k:k + n], _worker_conflicts))
+            for k in range(0, len(genes), n)]
+
+
+def _score_rows(
+    rows,
+    conflicts: List[int],
+    pool: Optional[ProcessPoolExecutor] = None,
+    workers: int = 1,
+) -> List[int]:
+    """
+    Fitness (number of placed panels) of every row, in order.
+    With a pool, the rows are split into one chunk per worker and only
+    compact index arrays cross the process boundary.
+    """
+    if pool is None:
+        return [len(_decode_indices(ind.tolist(), conflicts)) for ind in rows]
+    chunk = max(1, -(-len(rows) // workers))
+    packed = [
+        b"".join(ind.tobytes() for ind in rows[k:k + chunk])
+        for k in range(0, len(rows), chunk)
+    ]
+    return [f for part in pool.map(_score_packed, packed) for f in part]
+
+
+class _FitnessCache:
+    """
+    Bounded LRU map: permutation digest -> fitness.
+    Keys are fixed-size digests (see _perm_key), so memory is bounded by
+    maxsize whatever the slot count. Elites and repeated children are
+    re-scored for free; hits/misses are kept so a run can report how many
+    decodes the cache saved.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[bytes, int]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[int]:
+        f = self._data.get(key)
+        if f is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return f
+
+    def put(self, key: bytes, fitness: int) -> None:
+        self._data[key] = fitness
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def _perm_key(row) -> bytes:
+    """16-byte BLAKE2b digest of an int32 permutation row, used as cache key."""
+    return hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+
+def _score_population(
+    population,
+    conflicts: List[int],
+    pool: Optional[ProcessPoolExecutor] = None,
+    workers: int = 1,
+    cache: Optional[_FitnessCache] = None,
+) -> List[int]:
+    """
+    Fitness of every individual, in population order.
+    With a cache, only permutations not seen before are decoded
+    (each distinct one once, even if it occurs several times).
+    """
+    if cache is None:
+        return _score_rows(population, conflicts, pool, workers)
+    fits: List[Optional[int]] = [None] * len(population)
+    pending = {}   # key -> row positions waiting for this decode
+    for k in range(len(population)):
+        key = _perm_key(population[k])
+        if key in pending:
+            pending[key].append(k)
+            cache.hits += 1
+            continue
+        f = cache.get(key)
+        if f is None:
+            pending[key] = [k]
+        else:
+            fits[k] = f
+    if pending:
+        rows = [population[ks[0]] for ks in pending.values()]
+        for (key, ks), f in zip(pending.items(), _score_rows(rows, conflicts, pool, workers)):
+            cache.put(key, f)
+            for k in ks:
+                fits[k] = f
+    return fits  # type: ignore
+
+
 # ---------- RUN GA FOR ONE ROOF SIDE ----------
 
+@dataclass
+class GAEvent:
+    """
+    Progress of one GA generation, as yielded by _iter_ga_for_side.
+    layout is the layout dict of the best individual found so far;
+    stop_reason is set on the last event of a run ("generations", "bound",
+    "stall" or "time"), and then layout also carries the run statistics
+    (see finish()).
+    """
+    side: str
+    generation: int       # 1-based
+    n_generations: int
+    n_slots: int
+    best: int             # best fitness of this generation
+    global_best: int
+    mean: float
+    diversity: float      # mean fraction of genes differing from this generation's best
+    elapsed: float        # seconds since the run started
+    evaluations: int      # individuals scored so far (cache hits included)
+    evals_per_s: float
+    improved: bool
+    layout: dict
+    upper_bound: Optional[int] = None
+    cache_stats: Optional[dict] = None
+    stop_reason: Optional[str] = None
+
+    def finish(self, stop_reason: str) -> dict:
+        """Best layout with the run statistics, as returned by _run_ga_for_side."""
+        data = dict(self.layout, generations=self.generation, stop_reason=stop_reason,
+                    upper_bound=self.upper_bound)
+        if self.cache_stats is not None:
+            data["cache_stats"] = self.cache_stats
+        return data
+
+
+def _diversity(population, k_best: int) -> float:
+    """Mean normalized Hamming distance of every row to row k_best."""
+    if len(population) == 0 or len(population[0]) == 0:
+        return 0.0
+    ref = population[k_best]
+    if np is not None and isinstance(population, np.ndarray):
+        return float((population != ref).mean())
+    n = len(ref)
+    diff = sum(a != b for row in population for a, b in zip(row, ref))
+    return diff / (len(population) * n)
+
+
+def _iter_ga_for_side(
+    side: str,
+    roof: Roof,
+    panel: Panel,
+    border: int,
+    obstacles: List[Obstacle],
+    n_generations: int = 10,
+    pop_size: int = 30,
+    p_mut: float = 0.2,
+    elite_size: int = 2,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    cache_size: int = 10000,
+    stall_generations: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    stop_at_bound: bool = True,
+    slot_step: Optional[float] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 10,
+    resume_state: Optional[dict] = None,
+) -> Iterator[GAEvent]:
+    """
+    GA for one roof half as a generator: yields a GAEvent after every
+    generation has been scored, before the next one is bred.
+    Closing the generator (e.g. break in a for loop) stops the run and
+    shuts down the worker pool; the last event received holds the best
+    layout so far. See _run_ga_for_side for the parameters.
+    resume_state is the "state" of a checkpoint (see _load_checkpoint);
+    the run then continues from the population stored there.
+    """
+    if checkpoint_path is not None and checkpoint_every < 1:
+        raise ValueError(f"checkpoint_every must be >= 1, got {checkpoint_every!r}")
+    # everything except workers/resume_state, so a checkpoint can restart the run
+    run_args = dict(side=side, roof=roof, panel=panel, border=border, obstacles=obstacles,
+                    n_generations=n_generations, pop_size=pop_size, p_mut=p_mut,
+                    elite_size=elite_size, seed=seed, cache_size=cache_size,
+                    stall_generations=stall_generations, time_budget=time_budget,
+                    stop_at_bound=stop_at_bound, slot_step=slot_step,
+                    checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+    t0 = time.perf_counter()
+    rng = random if seed is None else random.Random(seed)
+    slots, conflicts = _slots_and_conflicts(side, roof, panel, border, obstacles, slot_step)
+    bound = _upper_bound(slots, conflicts, roof, panel, border, obstacles) if stop_at_bound else None
+    n_slots = len(slots)
+
+    best_data: Optional[dict] = None
+    best_fit = -1
+    best_placed: Optional[List[int]] = None
+    cache = _FitnessCache(cache_size) if cache_size > 0 else None
+    stall = 0
+    evaluations = 0
+    start_gen = 0
+
+    if resume_state is None:
+        # initialize population: each row is a permutation of slot indices
+        population = _random_population(pop_size, n_slots, rng)
+    else:
+        if (resume_state["pop_size"], resume_state["n_slots"]) != (pop_size, n_slots):
+            raise ValueError(f"[{side}] checkpoint is for pop_size={resume_state['pop_size']}, "
+                             f"n_slots={resume_state['n_slots']}; this run has "
+                             f"pop_size={pop_size}, n_slots={n_slots}")
+        population = _unpack_population(resume_state["population"], pop_size, n_slots)
+        rng.setstate(resume_state["rng_state"])
+        start_gen = resume_state["generation"]
+        best_fit = resume_state["best_fit"]
+        best_placed = resume_state["best_placed"]
+        stall = resume_state["stall"]
+        evaluations = resume_state["evaluations"]
+        t0 -= resume_state["elapsed"]   # time_budget covers the whole run
+        if best_placed is not None:
+            placed_rects = [(slots[i].x, slots[i].y, slots[i].w, slots[i].h) for i in best_placed]
+            best_data = _layout_data(placed_rects, panel, border)
+
+    # the pool receives the conflict graph once and lives for the whole run
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=_init_worker, initargs=(conflicts,))
+    try:
+        for gen in range(start_gen, n_generations):
+            fits = _score_population(population, conflicts, pool, workers, cache)
+            evaluations += len(fits)
+            improved = False
+            for k, f in enumerate(fits):
+                if f > best_fit:
+                    best_fit = f
+                    best_placed = _decode_indices(population[k].tolist(), conflicts)
+                    improved = True
+            if improved:
+                placed_rects = [(slots[i].x, slots[i].y, slots[i].w, slots[i].h) for i in best_placed]
+                best_data = _layout_data(placed_rects, panel, border)
+            stall = 0 if improved else stall + 1
+
+            # rank row indices by fitness (stable, best first)
+            ranked = sorted(range(len(fits)), key=lambda k: fits[k], reverse=True)
+
+            # stopping criteria
+            elapsed = time.perf_counter() - t0
+            stop_reason = None
+            if bound is not None and best_fit >= bound:
+                stop_reason = "bound"
+            elif stall_generations is not None and stall >= stall_generations:
+                stop_reason = "stall"
+            elif time_budget is not None and elapsed >= time_budget:
+                stop_reason = "time"
+            elif gen + 1 == n_generations:
+                stop_reason = "generations"
+
+            event = GAEvent(
+                side=side, generation=gen + 1, n_generations=n_generations, n_slots=n_slots,
+                best=fits[ranked[0]], global_best=best_fit, mean=sum(fits) / len(fits),
+                diversity=_diversity(population, ranked[0]), elapsed=elapsed,
+                evaluations=evaluations, evals_per_s=evaluations / elapsed if elapsed > 0 else 0.0,
+                improved=improved, layout=best_data, upper_bound=bound,
+                cache_stats=cache.stats() if cache is not None else None,
+            )
+            if stop_reason is not None:
+                event.stop_reason = stop_reason
+                event.layout = event.finish(stop_reason)
+            yield event
+            if stop_reason is not None:
+                break
+
+            # elitism
+            new_pop = _empty_population(pop_size, n_slots)
+            n_elite = min(elite_size, len(ranked), pop_size)
+            for k in range(n_elite):
+                new_pop[k] = population[ranked[k]]
+
+            # children
+            parents = ranked[: max(3, pop_size // 3)]
+            for k in range(n_elite, pop_size):
+                p1 = population[rng.choice(parents)]
+                p2 = population[rng.choice(parents)]
+                child = _order_crossover(p1, p2, rng)
+                _mutate_swap(child, p_mut, rng)
+                new_pop[k] = child
+
+            population = new_pop
+
+            if checkpoint_path is not None and (gen + 1) % checkpoint_every == 0:
+                _save_checkpoint(checkpoint_path, run_args, dict(
+                    generation=gen + 1, pop_size=pop_size, n_slots=n_slots,
+                    population=_pack_population(population), rng_state=rng.getstate(),
+                    best_fit=best_fit, best_placed=best_placed, stall=stall,
+                    evaluations=evaluations, elapsed=time.perf_counter() - t0,
+                ))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
 def _run_ga_for_side(
     side: str,
     roof: Roof,
@@ -209,52 +793,121 @@ def _run_ga_for_side(
     pop_size: int = 30,
     p_mut: float = 0.2,
     elite_size: int = 2,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    cache_size: int = 10000,
+    stall_generations: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    stop_at_bound: bool = True,
+    slot_step: Optional[float] = None,
+    on_generation: Optional[Callable[[GAEvent], Optional[bool]]] = None,
+    verbose: bool = True,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 10,
+    resume_state: Optional[dict] = None,
 ):
-    """Run GA for one roof half (left / right)."""
-    slots = _generate_slots_for_side(side, roof, panel, border, obstacles)
-    print(f"[{side}] Available slots count: {len(slots)}")
+    """
+    Run GA for one roof half (left / right) and return the best layout.
+    Stops early after stall_generations without improvement, after
+    time_budget seconds or (stop_at_bound) at the upper bound, see
+    "stop_reason". workers > 1 scores in a process pool (same result per
+    seed); slot_step switches to dense slots; on_generation gets every
+    GAEvent and stops the run by returning True; checkpoint_path saves the
+    run every checkpoint_every generations for _resume_ga_for_side.
+    """
+    event = None
+    first = True
+    for event in _iter_ga_for_side(
+            side, roof, panel, border, obstacles,
+            n_generations=n_generations, pop_size=pop_size, p_mut=p_mut,
+            elite_size=elite_size, workers=workers, seed=seed, cache_size=cache_size,
+            stall_generations=stall_generations, time_budget=time_budget,
+            stop_at_bound=stop_at_bound, slot_step=slot_step,
+            checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every,
+            resume_state=resume_state):
+        if verbose:
+            if first:
+                print(f"[{side}] Available slots count: {event.n_slots}")
+                first = False
+            print(f"[{side}] Gen {event.generation}/{n_generations}: "
+                  f"best={event.best}, global_best={event.global_best}")
+            if event.stop_reason not in (None, "generations"):
+                print(f"[{side}] Stopping after generation {event.generation}: {event.stop_reason}")
+        if on_generation is not None and on_generation(event) and event.stop_reason is None:
+            event.layout = event.finish("callback")
+            break
+
+    if event is None:
+        raise RuntimeError(f"[{side}] GA finished with no solution, something went wrong.")
 
-    # initialize population
-    population: List[List[Slot]] = [
-        random.sample(slots, len(slots)) for _ in range(pop_size)
-    ]
+    data = event.layout
+    if verbose and "cache_stats" in data:
+        stats = data["cache_stats"]
+        print(f"[{side}] Fitness cache: hits={stats['hits']}, misses={stats['misses']}, "
+              f"hit_rate={stats['hit_rate']:.1%}")
+    return data
 
-    best_data = None
-    best_fit = -1
 
-    for gen in range(n_generations):
-        scored = []
-        for ind in population:
-            data = _decode_individual(ind, roof, border, obstacles, panel)
-            f = _fitness(data)
-            scored.append((f, ind, data))
-            if f > best_fit:
-                best_fit = f
-                best_data = data
-
-        scored.sort(key=lambda t: t[0], reverse=True)
-        gen_best = scored[0][0]
-        print(f"[{side}] Gen {gen+1}/{n_generations}: best={gen_best}, global_best={best_fit}")
-
-        # elitism
-        new_pop: List[List[Slot]] = [
-            scored[i][1][:] for i in range(min(elite_size, len(scored)))
-        ]
-
-        # children
-        while len(new_pop) < pop_size:
-            p1 = random.choice(scored[: max(3, pop_size // 3)])[1]
-            p2 = random.choice(scored[: max(3, pop_size // 3)])[1]
-            child = _order_crossover(p1, p2)
-            _mutate_swap(child, p_mut)
-            new_pop.append(child)
-
-        population = new_pop
-
-    if best_data is None:
-        raise RuntimeError(f"[{side}] GA finished with no solution, something went wrong.")
+# ---------- CHECKPOINTS ----------
+# A checkpoint is a pickle of {"version", "args", "state"}: args are the
+# _run_ga_for_side arguments (roof, panel and obstacles included), state the
+# population as packed int32 slot indices, the RNG state, the next generation
+# and the best-so-far. The population is stored after breeding, before it is
+# scored, and scoring draws no random numbers, so a resumed run repeats the
+# original one exactly (the fitness cache starts empty, so only its hit
+# statistics differ). Checkpoints are pickles: only load files you wrote.
+
+CHECKPOINT_VERSION = 1
+
+
+def _pack_population(population) -> bytes:
+    """Population rows as one row-major int32 byte string."""
+    if np is not None and isinstance(population, np.ndarray):
+        return population.astype(np.int32, copy=False).tobytes()
+    return b"".join(row.tobytes() for row in population)
 
-    return best_data
+
+def _unpack_population(packed: bytes, pop_size: int, n_slots: int):
+    population = _empty_population(pop_size, n_slots)
+    if np is not None:
+        population[:] = np.frombuffer(packed, dtype=np.int32).reshape(pop_size, n_slots)
+        return population
+    genes = array("i")
+    genes.frombytes(packed)
+    for k in range(pop_size):
+        population[k] = genes[k * n_slots:(k + 1) * n_slots]
+    return population
+
+
+def _save_checkpoint(path: str, args: dict, state: dict) -> None:
+    """Write the checkpoint atomically, so a crash mid-write keeps the previous one."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"version": CHECKPOINT_VERSION, "args": args, "state": state}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _load_checkpoint(path: str) -> dict:
+    """Read a checkpoint written by _save_checkpoint: {"version", "args", "state"}."""
+    with open(path, "rb") as f:
+        ckpt = pickle.load(f)
+    if ckpt.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {ckpt.get('version')!r}")
+    return ckpt
+
+
+def _resume_ga_for_side(checkpoint_path: str, **overrides) -> dict:
+    """
+    Continue a _run_ga_for_side run from its checkpoint and return its layout.
+    The stored arguments are reused; overrides may change e.g. workers,
+    verbose, on_generation or n_generations (to extend a finished run).
+    Changing anything that affects the slots or the search breaks exactness.
+    """
+    ckpt = _load_checkpoint(checkpoint_path)
+    args = dict(ckpt["args"], **overrides)
+    return _run_ga_for_side(resume_state=ckpt["state"], **args)
 
 
 # ---------- MAIN FUNCTION ----------
@@ -262,7 +915,18 @@ def _run_ga_for_side(
 def run_evolutionary_top_view(
     generations: int = 10,
     pop_size: int = 30,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    concurrent: bool = False,
+    stall_generations: Optional[int] = None,
+    time_budget: Optional[float] = None,
 ):
+    """
+    Optimize both roof sides, plot and export.
+    concurrent=True runs the left and right GA in separate processes
+    (the sides share no state), so latency approaches the slower side.
+    stall_generations / time_budget are per-side stopping criteria.
+    """
     cfg = Config()
     BORDER = cfg.roof_left.border
 
@@ -280,17 +944,22 @@ def run_evolutionary_top_view(
     obstacles_left: List[Obstacle] = [Obstacle(**vars(o)) for o in cfg.obstacles_left]
     obstacles_right: List[Obstacle] = [Obstacle(**vars(o)) for o in cfg.obstacles_right]
 
-    print("[GA] Starting evolutionary search for left side...")
-    data_L = _run_ga_for_side(
-        "L", roof_left, panel_base, BORDER, obstacles_left,
-        n_generations=generations, pop_size=pop_size,
-    )
-
-    print("[GA] Starting evolutionary search for right side...")
-    data_R = _run_ga_for_side(
-        "R", roof_right, panel_base, BORDER, obstacles_right,
-        n_generations=generations, pop_size=pop_size,
-    )
+    ga_kwargs = dict(n_generations=generations, pop_size=pop_size, workers=workers, seed=seed,
+                     stall_generations=stall_generations, time_budget=time_budget)
+    if concurrent:
+        print("[GA] Starting evolutionary search for both sides concurrently...")
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            fut_L = pool.submit(_run_ga_for_side, "L", roof_left, panel_base, BORDER,
+                                obstacles_left, **ga_kwargs)
+            fut_R = pool.submit(_run_ga_for_side, "R", roof_right, panel_base, BORDER,
+                                obstacles_right, **ga_kwargs)
+            data_L, data_R = fut_L.result(), fut_R.result()
+    else:
+        print("[GA] Starting evolutionary search for left side...")
+        data_L = _run_ga_for_side("L", roof_left, panel_base, BORDER, obstacles_left, **ga_kwargs)
+
+        print("[GA] Starting evolutionary search for right side...")
+        data_R = _run_ga_for_side("R", roof_right, panel_base, BORDER, obstacles_right, **ga_kwargs)
 
     total_panels = data_L["total_panels"] + data_R["total_panels"]
     print(f"[GA] Summary: L={data_L['total_panels']} panels, "
@@ -314,6 +983,8 @@ def run_evolutionary_top_view(
         clamp_margin=panel_base.clamp_margin,
     )
 
+    from plotter_top_view import draw_two_roofs_columns  # lazy: matplotlib
+
     draw_two_roofs_columns(
         roof_left, roof_right,
         panel_for_plot,
@@ -338,4 +1009,5 @@ def run_evolutionary_top_view(
 
 if __name__ == "__main__":
     # As per spec: run 10 generations.
-    run_evolutionary_top_view(generations=10, pop_size=30)
+    run_evolutionary_top_view(generations=10, pop_size=30,
+                              concurrent="--concurrent" in sys.argv)
@@ -0,0 +1,218 @@
+# visualization_exact.py
+"""
+Exact top-view packing, an alternative to the GA in visualization_ea.py.
+Run:  python visualization_exact.py
+
+The candidate slots of one roof side plus their pairwise conflicts form a
+maximum independent set problem. It is solved by depth-first branch and
+bound over bitsets (Python ints):
+- branch on a slot: place it (drop its conflicts) or forbid it;
+- slots with at most one remaining conflict are placed without branching;
+- a node is pruned when placed + clique-cover bound of the remaining
+  candidates cannot beat the incumbent.
+Small roofs are solved to optimality; with a time/node limit the search
+is anytime and reports the best layout so far with its optimality gap.
+"""
+
+import os
+import time
+from typing import List, Optional
+
+from config import Config
+from roof import Roof
+from panel import Panel
+from project_utils import Obstacle, assert_layout_valid, export_csv
+from visualization_ea import (
+    _slots_and_conflicts,
+    _upper_bound, _clique_cover_bound, _decode_indices, _layout_data,
+)
+
+
+# ---------- BRANCH AND BOUND ----------
+
+def _bits(mask: int):
+    """Yield indices of set bits, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _max_independent_set(
+    conflicts: List[int],
+    incumbent: List[int],
+    root_bound: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    node_limit: Optional[int] = None,
+):
+    """
+    Maximum set of pairwise non-conflicting slots.
+    incumbent: a feasible starting solution (e.g. a greedy decode).
+    Returns (best_indices, upper_bound, nodes, optimal).
+    """
+    t0 = time.perf_counter()
+    n = len(conflicts)
+    best = list(incumbent)
+    best_size = len(best)
+    nodes = 0
+    bound_cap = root_bound if root_bound is not None else n
+
+    # DFS stack of (candidates, placed bitset, placed count)
+    stack = [((1 << n) - 1, 0, 0)]
+    aborted = False
+    while stack:
+        if (node_limit is not None and nodes >= node_limit) or \
+           (time_limit is not None and time.perf_counter() - t0 >= time_limit):
+            aborted = True
+            break
+        cand, placed, size = stack.pop()
+        nodes += 1
+
+        # reduction: a candidate with <= 1 conflicting candidate is always safe to place
+        changed = True
+        while changed and cand:
+            changed = False
+            for v in _bits(cand):
+                if (conflicts[v] & cand).bit_count() <= 2:   # itself + at most one neighbour
+                    placed |= 1 << v
+                    size += 1
+                    cand &= ~conflicts[v]
+                    changed = True
+                    break
+
+        if not cand:
+            if size > best_size:
+                best, best_size = list(_bits(placed)), size
+                if best_size >= bound_cap:
+                    stack.clear()
+            continue
+        if size + _clique_cover_bound(conflicts, cand) <= best_size:
+            continue
+
+        # branch on the candidate with most conflicts: forbid it / place it (explored first)
+        v = max(_bits(cand), key=lambda i: (conflicts[i] & cand).bit_count())
+        stack.append((cand & ~(1 << v), placed, size))
+        stack.append((cand & ~conflicts[v], placed | (1 << v), size + 1))
+
+    if aborted:
+        # every unexplored node can still reach at most its own bound
+        open_bound = max(size + _clique_cover_bound(conflicts, cand) for cand, _, size in stack)
+        upper = min(bound_cap, max(best_size, open_bound))
+    else:
+        upper = best_size
+    return sorted(best), upper, nodes, upper == best_size
+
+
+def _solve_exact_for_side(
+    side: str,
+    roof: Roof,
+    panel: Panel,
+    border: int,
+    obstacles: List[Obstacle],
+    time_limit: Optional[float] = None,
+    node_limit: Optional[int] = None,
+    slot_step: Optional[float] = None,
+    verbose: bool = True,
+) -> dict:
+    """
+    Exact maximum packing of the candidate slots for one roof half
+    (the two lattices, or every feasible slot on a slot_step-mm lattice).
+    The layout carries "optimal", "upper_bound", "gap" (upper_bound - panels)
+    and "nodes"; with a limit hit the best-so-far layout is returned.
+    verbose=False silences the progress lines.
+    """
+    slots, conflicts = _slots_and_conflicts(side, roof, panel, border, obstacles, slot_step)
+    if verbose:
+        print(f"[{side}] Available slots count: {len(slots)}")
+
+    root_bound = _upper_bound(slots, conflicts, roof, panel, border, obstacles)
+    incumbent = max(
+        (_decode_indices(order, conflicts) for order in
+         (range(len(slots)), range(len(slots) - 1, -1, -1))),
+        key=len,
+    )
+    best, upper, nodes, optimal = _max_independent_set(
+        conflicts, incumbent, root_bound, time_limit=time_limit, node_limit=node_limit)
+    if verbose:
+        print(f"[{side}] B&B: panels={len(best)}, upper_bound={upper}, nodes={nodes}, "
+              f"{'optimal' if optimal else 'gap=' + str(upper - len(best))}")
+
+    placed_rects = [(slots[i].x, slots[i].y, slots[i].w, slots[i].h) for i in best]
+    data = _layout_data(placed_rects, panel, border)
+    data["optimal"] = optimal
+    data["upper_bound"] = upper
+    data["gap"] = upper - len(best)
+    data["nodes"] = nodes
+    return data
+
+
+# ---------- MAIN FUNCTION ----------
+
+def run_exact_top_view(time_limit: Optional[float] = 30.0, node_limit: Optional[int] = None):
+    """Exact counterpart of run_evolutionary_top_view (time_limit is per side)."""
+    cfg = Config()
+    BORDER = cfg.roof_left.border
+
+    roof_left = Roof(width=cfg.roof_left.width, length=cfg.roof_left.length)
+    roof_right = Roof(width=cfg.roof_right.width, length=cfg.roof_right.length)
+
+    panel_base = Panel(
+        width=cfg.panel.width,
+        height=cfg.panel.height,
+        gap_x=cfg.panel.gap_x,
+        gap_y=cfg.panel.gap_y,
+        clamp_margin=cfg.panel.clamp,
+    )
+
+    obstacles_left: List[Obstacle] = [Obstacle(**vars(o)) for o in cfg.obstacles_left]
+    obstacles_right: List[Obstacle] = [Obstacle(**vars(o)) for o in cfg.obstacles_right]
+
+    print("[EXACT] Solving left side...")
+    data_L = _solve_exact_for_side("L", roof_left, panel_base, BORDER, obstacles_left,
+                                   time_limit=time_limit, node_limit=node_limit)
+    print("[EXACT] Solving right side...")
+    data_R = _solve_exact_for_side("R", roof_right, panel_base, BORDER, obstacles_right,
+                                   time_limit=time_limit, node_limit=node_limit)
+
+    total_panels = data_L["total_panels"] + data_R["total_panels"]
+    print(f"[EXACT] Summary: L={data_L['total_panels']} panels, "
+          f"R={data_R['total_panels']} panels, total={total_panels}")
+
+    assert_layout_valid(roof_left, BORDER, data_L, obstacles_left)
+    assert_layout_valid(roof_right, BORDER, data_R, obstacles_right)
+
+    png_path = None
+    if cfg.save_png:
+        png_path = os.path.join(cfg.out_dir, "exact_top_view.png")
+        os.makedirs(cfg.out_dir, exist_ok=True)
+
+    panel_for_plot = Panel(
+        width=data_L["panel_w"],
+        height=data_L["panel_h"],
+        gap_x=panel_base.gap_x,
+        gap_y=panel_base.gap_y,
+        clamp_margin=panel_base.clamp_margin,
+    )
+
+    from plotter_top_view import draw_two_roofs_columns  # lazy: matplotlib
+
+    draw_two_roofs_columns(
+        roof_left, roof_right,
+        panel_for_plot,
+        data_L, data_R,
+        obstacles_left=obstacles_left,
+        obstacles_right=obstacles_right,
+        save_path=png_path,
+        show=True,
+    )
+    if png_path:
+        print(f"[SAVE] Exact top-view saved to: {os.path.abspath(png_path)}")
+
+    if cfg.save_csv:
+        export_csv(os.path.join(cfg.out_dir, "exact_panels_left.csv"), "L", data_L, panel_base)
+        export_csv(os.path.join(cfg.out_dir, "exact_panels_right.csv"), "R", data_R, panel_base)
+        print(f"[EXPORT] CSV for exact layout saved in {cfg.out_dir}")
+
+
+if __name__ == "__main__":
+    run_exact_top_view()
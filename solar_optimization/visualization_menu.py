@@ -12,6 +12,7 @@ RESULTS_DIR = os.path.abspath(os.path.join(BASE_DIR, "results"))
 
 VISUALIZATION_TOP = os.path.join(BASE_DIR, "visualization.py")
 VISUALIZATION_EA = os.path.join(BASE_DIR, "visualization_ea.py")
+VISUALIZATION_EXACT = os.path.join(BASE_DIR, "visualization_exact.py")
 VISUALIZATION_SIDE = os.path.join(BASE_DIR, "visualization_side.py")
 
 
@@ -37,6 +38,12 @@ class GraphMenu:
         )
         self.btn_ea.pack(side=tk.LEFT, padx=5)
 
+        self.btn_exact = tk.Button(
+            btn_frame, text="Top view (exact)",
+            command=lambda: self.run_script(VISUALIZATION_EXACT)
+        )
+        self.btn_exact.pack(side=tk.LEFT, padx=5)
+
         self.btn_side = tk.Button(
             btn_frame, text="Side view",
             command=lambda: self.run_script(VISUALIZATION_SIDE)